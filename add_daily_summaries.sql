@@ -0,0 +1,14 @@
+-- Per-user daily nutrition totals, maintained by the server whenever a
+-- prediction is saved. Fill it from existing history with
+--   python daily_summary.py
+CREATE TABLE IF NOT EXISTS user_daily_summaries (
+    user_id INT NOT NULL,
+    day DATE NOT NULL,
+    calories DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    protein DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    carbs DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    fats DECIMAL(10, 2) NOT NULL DEFAULT 0,
+    meal_count INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, day)
+);
@@ -0,0 +1,9 @@
+-- Composite indexes for the keyset-paginated prediction history
+-- (/api/predictions/history/<user_id>): pages are read in
+-- (user_id, created_at, id) order, and each page's ingredients are fetched
+-- by prediction_id, strongest first.
+CREATE INDEX idx_food_predictions_user_history
+    ON food_predictions (user_id, created_at, id);
+
+CREATE INDEX idx_prediction_ingredients_prediction
+    ON prediction_ingredients (prediction_id, confidence);
@@ -0,0 +1,10 @@
+-- Add the side dishes the local multi-label model can detect to ingredients,
+-- so /predict saves them like Roboflow detections
+INSERT INTO ingredients (name)
+SELECT 'Telur' WHERE NOT EXISTS (SELECT * FROM ingredients WHERE name = 'Telur');
+
+INSERT INTO ingredients (name)
+SELECT 'Timun' WHERE NOT EXISTS (SELECT * FROM ingredients WHERE name = 'Timun');
+
+INSERT INTO ingredients (name)
+SELECT 'Kacang' WHERE NOT EXISTS (SELECT * FROM ingredients WHERE name = 'Kacang');
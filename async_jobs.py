@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobQueue:
+    """
+    Runs jobs on a bounded in-process worker pool and keeps their results
+    for polling. At most max_pending jobs may be queued or running at once;
+    beyond that submit() raises QueueFullError. Finished jobs are forgotten
+    after result_ttl seconds.
+    """
+
+    def __init__(self, workers=4, max_pending=64, result_ttl=600.0):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="predict-job")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        """
+        Queue fn(*args) and return its job id. fn returns (payload, http status).
+        """
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError(f"{self.max_pending} jobs already pending")
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job_id] = {
+                'id': job_id,
+                'status': 'queued',
+                'created_at': time.time(),
+            }
+        try:
+            self._executor.submit(self._run, job_id, fn, args)
+        except Exception:
+            with self._lock:
+                del self._jobs[job_id]
+            self._slots.release()
+            raise
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def stats(self):
+        with self._lock:
+            counts = {'queued': 0, 'running': 0, 'done': 0, 'failed': 0}
+            for job in self._jobs.values():
+                counts[job['status']] += 1
+        counts.update({'workers': self.workers, 'max_pending': self.max_pending})
+        return counts
+
+    def _run(self, job_id, fn, args):
+        self._update(job_id, status='running', started_at=time.time())
+        try:
+            payload, status_code = fn(*args)
+            self._update(
+                job_id,
+                status='done' if status_code < 400 else 'failed',
+                status_code=status_code,
+                result=payload,
+                finished_at=time.time()
+            )
+        except Exception as e:
+            self._update(job_id, status='failed', status_code=500,
+                         result={'error': str(e)}, finished_at=time.time())
+        finally:
+            self._slots.release()
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.get('finished_at', float('inf')) < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,138 @@
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+import side_dishes
+from model_backends import BACKENDS, load_backend
+
+# Parity-and-speed report for the server model backends. Each backend runs in
+# its own subprocess so the peak RSS numbers aren't polluted by the others.
+
+MODELS = {
+    'main': ("food_classification_model.keras", "dataset/validation"),
+    'side': ("nasi_lemak_side_dishes_model.keras", "dataset_side_dishes/validation"),
+}
+
+
+def load_validation_set(image_dir):
+    """
+    Load every validation image the way server.py preprocesses uploads,
+    labelled by the index of its (sorted) class directory
+    """
+    images, labels = [], []
+    for label, class_name in enumerate(sorted(os.listdir(image_dir))):
+        class_dir = os.path.join(image_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        for img_name in sorted(os.listdir(class_dir)):
+            if not img_name.lower().endswith((".jpg", ".jpeg", ".png")):
+                continue
+            img = Image.open(os.path.join(class_dir, img_name)).convert('RGB').resize((224, 224))
+            images.append(np.asarray(img, dtype=np.float32) / 255.0)
+            labels.append(label)
+    return np.stack(images), np.array(labels)
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(backend, model_name):
+    keras_path, image_dir = MODELS[model_name]
+    images, labels = load_validation_set(image_dir)
+
+    start = time.perf_counter()
+    model = load_backend(backend, keras_path)
+    load_time = time.perf_counter() - start
+
+    # Warm-up pass so graph tracing / tensor allocation isn't timed
+    model.predict(images[:1])
+
+    outputs, latencies = [], []
+    for img_array in images:
+        start = time.perf_counter()
+        outputs.append(np.asarray(model.predict(img_array[np.newaxis]))[0])
+        latencies.append(time.perf_counter() - start)
+
+    json.dump({
+        'outputs': np.array(outputs).tolist(),
+        'labels': labels.tolist(),
+        'latencies_ms': (np.array(latencies) * 1000).tolist(),
+        'load_time_s': load_time,
+        'peak_rss_mb': peak_rss_mb(),
+    }, sys.stdout)
+
+
+def predicted_labels(outputs, model_name):
+    if model_name == 'side':
+        # Validation images are labelled by their side dish folder (sorted);
+        # count the most confident side dish, or "none" (the last label) when
+        # nothing clears the default threshold
+        folders = sorted(side_dishes.FOLDERS[:outputs.shape[1]])
+        by_folder = outputs[:, [side_dishes.FOLDERS.index(folder) for folder in folders]]
+        return np.where(by_folder.max(axis=1) > side_dishes.DEFAULT_THRESHOLD,
+                        np.argmax(by_folder, axis=1), len(folders))
+    return np.argmax(outputs, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare model backends against Keras")
+    parser.add_argument("--model", choices=list(MODELS), default='main')
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.model)
+        return
+
+    results = {}
+    for backend in args.backends:
+        print(f"🔄 Running {args.model} model with the '{backend}' backend...", file=sys.stderr)
+        proc = subprocess.run(
+            [sys.executable, __file__, "--model", args.model, "--worker", backend],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f"❌ {backend} failed:\n{proc.stderr}", file=sys.stderr)
+            continue
+        results[backend] = json.loads(proc.stdout)
+
+    reference = results.get('keras')
+    print(f"\n{'backend':<14} {'accuracy':>9} {'agree':>7} {'max |Δp|':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'load s':>7} {'RSS MB':>8}")
+    for backend, result in results.items():
+        outputs = np.array(result['outputs'])
+        labels = np.array(result['labels'])
+        predicted = predicted_labels(outputs, args.model)
+        accuracy = np.mean(predicted == labels) * 100
+
+        if reference is not None:
+            reference_outputs = np.array(reference['outputs'])
+            agree = f"{np.mean(predicted == predicted_labels(reference_outputs, args.model)) * 100:.1f}%"
+            drift = f"{np.max(np.abs(outputs - reference_outputs)):.4f}"
+        else:
+            agree = drift = "n/a"
+
+        latencies = np.array(result['latencies_ms'])
+        rss = result['peak_rss_mb']
+        print(f"{backend:<14} {accuracy:>8.1f}% {agree:>7} {drift:>9} "
+              f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f} "
+              f"{result['load_time_s']:>7.2f} {rss if rss is None else round(rss):>8}")
+
+
+if __name__ == "__main__":
+    main()
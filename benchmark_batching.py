@@ -0,0 +1,103 @@
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import argparse
+import glob
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.preprocessing import image
+
+from inference_batcher import InferenceBatcher
+
+# Compares the current /predict path (one model.predict per request, each in
+# its own thread) with the micro-batching InferenceBatcher used by server.py.
+
+
+def load_test_images(pattern="test_image/*"):
+    arrays = []
+    for img_path in sorted(glob.glob(pattern)):
+        img = image.load_img(img_path, target_size=(224, 224))
+        img_array = image.img_to_array(img)
+        arrays.append(np.expand_dims(img_array, axis=0) / 255.0)
+    if not arrays:
+        raise SystemExit(f"No images found matching {pattern}")
+    return arrays
+
+
+def run_load(call, images, total_requests, concurrency):
+    latencies = []
+    latencies_lock = threading.Lock()
+    counter = iter(range(total_requests))
+    counter_lock = threading.Lock()
+
+    def worker():
+        while True:
+            with counter_lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            call(images[i % len(images)])
+            elapsed = time.perf_counter() - start
+            with latencies_lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'throughput': total_requests / wall,
+        'p50': np.percentile(latencies_ms, 50),
+        'p95': np.percentile(latencies_ms, 95),
+        'p99': np.percentile(latencies_ms, 99),
+    }
+
+
+def print_row(label, stats):
+    print(f"{label:<28} {stats['throughput']:>10.1f} {stats['p50']:>10.1f} "
+          f"{stats['p95']:>10.1f} {stats['p99']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-request vs micro-batched inference")
+    parser.add_argument("--model", default="food_classification_model.keras")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-batch-size", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    model = tf.keras.models.load_model(args.model)
+    images = load_test_images()
+
+    # Warm up both code paths so graph tracing isn't counted
+    model.predict(images[0], verbose=0)
+    model.predict_on_batch(np.concatenate(images, axis=0))
+
+    print(f"🔄 {args.requests} requests, {args.concurrency} concurrent clients\n")
+    print(f"{'path':<28} {'img/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+
+    stats = run_load(lambda x: model.predict(x, verbose=0), images, args.requests, args.concurrency)
+    print_row("per-request predict", stats)
+
+    for max_batch_size in args.max_batch_size:
+        batcher = InferenceBatcher(
+            model.predict_on_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=args.max_wait_ms
+        )
+        stats = run_load(batcher.predict, images, args.requests, args.concurrency)
+        print_row(f"batched (max {max_batch_size}, {args.max_wait_ms:g} ms)", stats)
+
+
+if __name__ == "__main__":
+    main()
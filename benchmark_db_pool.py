@@ -0,0 +1,71 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+import requests
+
+# HTTP load test for the cheap database-backed endpoints. Run it against a
+# server started with FDDC_DB_POOL_SIZE=0 (a fresh MySQL connection per
+# request, the old behaviour) and again with the default pool:
+#
+#   FDDC_DB_POOL_SIZE=0 python server.py   ->  python benchmark_db_pool.py
+#   python server.py                       ->  python benchmark_db_pool.py
+
+
+def run_load(url, concurrency, duration):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker():
+        session = requests.Session()
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = session.get(url, timeout=10).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'rps': len(latencies) / wall,
+        'p50': np.percentile(latencies_ms, 50),
+        'p95': np.percentile(latencies_ms, 95),
+        'errors': errors[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/second benchmark for DB-backed endpoints")
+    parser.add_argument("--base-url", default="http://localhost:5001")
+    parser.add_argument("--paths", nargs="+", default=["/api/food-categories", "/api/food-info/1"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    args = parser.parse_args()
+
+    print(f"{'path':<26} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for path in args.paths:
+        for concurrency in args.concurrency:
+            stats = run_load(args.base_url + path, concurrency, args.duration)
+            print(f"{path:<26} {concurrency:>7} {stats['rps']:>9.1f} {stats['p50']:>8.1f} "
+                  f"{stats['p95']:>8.1f} {stats['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from db_pool import db_session
+
+# Benchmarks the prediction history queries on a synthetic heavy user:
+#   legacy - the old unpaginated four-way JOIN with GROUP_CONCAT
+#   keyset - the paginated query used by /api/predictions/history/<user_id>,
+#            first page and a page deep into the history
+# Run add_history_indexes.sql first to see the indexed numbers.
+
+LEGACY_QUERY = """
+SELECT
+    p.*,
+    f.name as food_name,
+    f.description as food_description,
+    fi.calories, fi.protein, fi.carbs, fi.fats,
+    GROUP_CONCAT(
+        CONCAT(i.name, ':', pi.confidence * 100)
+        ORDER BY pi.confidence DESC
+        SEPARATOR ','
+    ) as ingredients
+FROM food_predictions p
+LEFT JOIN food_categories f ON p.food_category_id = f.id
+LEFT JOIN food_info fi ON p.food_category_id = fi.food_category_id
+LEFT JOIN prediction_ingredients pi ON p.id = pi.prediction_id
+LEFT JOIN ingredients i ON pi.ingredient_id = i.id
+WHERE p.user_id = %s AND i.name IS NOT NULL
+GROUP BY p.id
+ORDER BY p.created_at DESC
+"""
+
+KEYSET_QUERY = """
+SELECT p.*
+FROM food_predictions p
+WHERE p.user_id = %s
+AND EXISTS (
+    SELECT 1 FROM prediction_ingredients pi
+    JOIN ingredients i ON pi.ingredient_id = i.id
+    WHERE pi.prediction_id = p.id
+)
+{after}
+ORDER BY p.created_at DESC, p.id DESC LIMIT %s
+"""
+
+INGREDIENTS_QUERY = """
+SELECT pi.prediction_id, i.name, pi.confidence * 100 AS confidence
+FROM prediction_ingredients pi
+JOIN ingredients i ON pi.ingredient_id = i.id
+WHERE pi.prediction_id IN ({placeholders})
+ORDER BY pi.prediction_id, pi.confidence DESC
+"""
+
+
+def populate(conn, user_id, rows, chunk=5000):
+    cursor = conn.cursor()
+    cursor.execute("SELECT id FROM food_categories")
+    category_ids = [row[0] for row in cursor.fetchall()]
+    cursor.execute("SELECT id FROM ingredients")
+    ingredient_ids = [row[0] for row in cursor.fetchall()]
+    if not category_ids or not ingredient_ids:
+        raise SystemExit("food_categories and ingredients need at least one row each")
+
+    print(f"🔄 Inserting {rows} synthetic predictions for user {user_id}...")
+    start_time = datetime.now() - timedelta(days=3 * 365)
+    for offset in range(0, rows, chunk):
+        count = min(chunk, rows - offset)
+        cursor.executemany("""
+            INSERT INTO food_predictions (user_id, food_category_id, confidence, image_path, created_at)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [
+            (user_id, random.choice(category_ids), random.random(), 'uploads/synthetic.jpg',
+             start_time + timedelta(seconds=90 * (offset + i)))
+            for i in range(count)
+        ])
+        first_id = cursor.lastrowid
+        # One to three side dishes per prediction
+        cursor.executemany("""
+            INSERT INTO prediction_ingredients (prediction_id, ingredient_id, confidence)
+            VALUES (%s, %s, %s)
+        """, [
+            (first_id + i, ingredient_id, random.random())
+            for i in range(count)
+            for ingredient_id in random.sample(ingredient_ids, min(len(ingredient_ids), random.randint(1, 3)))
+        ])
+        conn.commit()
+        print(f"   {offset + count}/{rows}", end="\r")
+    print()
+
+
+def cleanup(conn, user_id):
+    cursor = conn.cursor()
+    cursor.execute("""
+        DELETE pi FROM prediction_ingredients pi
+        JOIN food_predictions p ON pi.prediction_id = p.id
+        WHERE p.user_id = %s
+    """, (user_id,))
+    cursor.execute("DELETE FROM food_predictions WHERE user_id = %s", (user_id,))
+    conn.commit()
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def keyset_page(conn, user_id, limit, after=None):
+    cursor = conn.cursor(dictionary=True)
+    params = [user_id]
+    after_sql = ""
+    if after:
+        after_sql = "AND (p.created_at < %s OR (p.created_at = %s AND p.id < %s))"
+        params += [after[0], after[0], after[1]]
+    cursor.execute(KEYSET_QUERY.format(after=after_sql), params + [limit])
+    page = cursor.fetchall()
+    if page:
+        cursor.execute(
+            INGREDIENTS_QUERY.format(placeholders=", ".join(["%s"] * len(page))),
+            [row['id'] for row in page]
+        )
+        cursor.fetchall()
+    cursor.close()
+    return page
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prediction history queries")
+    parser.add_argument("--user-id", type=int, default=990001, help="synthetic user (must exist if FKs are enforced)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-populate", action="store_true", help="reuse rows from a previous run")
+    parser.add_argument("--skip-legacy", action="store_true", help="the legacy query can take minutes")
+    parser.add_argument("--cleanup", action="store_true", help="delete the synthetic rows afterwards")
+    args = parser.parse_args()
+
+    with db_session() as conn:
+        if not args.skip_populate:
+            populate(conn, args.user_id, args.rows)
+
+        if not args.skip_legacy:
+            def legacy():
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(LEGACY_QUERY, (args.user_id,))
+                rows = cursor.fetchall()
+                cursor.close()
+                return rows
+            ms, rows = timed(legacy, args.repeat)
+            print(f"legacy (all {len(rows)} rows):       {ms:10.1f} ms")
+
+        ms, page = timed(lambda: keyset_page(conn, args.user_id, args.limit), args.repeat)
+        print(f"keyset first page ({args.limit} rows):  {ms:10.1f} ms")
+
+        # Jump roughly halfway into the history to time a deep page
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT created_at, id FROM food_predictions WHERE user_id = %s
+            ORDER BY created_at DESC, id DESC LIMIT 1 OFFSET %s
+        """, (args.user_id, args.rows // 2))
+        middle = cursor.fetchone()
+        cursor.close()
+        if middle:
+            ms, page = timed(lambda: keyset_page(conn, args.user_id, args.limit, middle), args.repeat)
+            print(f"keyset deep page ({args.limit} rows):   {ms:10.1f} ms")
+
+        if args.cleanup:
+            cleanup(conn, args.user_id)
+            print("🧹 Synthetic rows deleted")
+
+
+if __name__ == "__main__":
+    main()
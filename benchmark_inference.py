@@ -0,0 +1,374 @@
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import tta
+from benchmark_backends import MODELS, peak_rss_mb, predicted_labels
+from image_pipeline import preprocess_image
+from model_backends import BACKENDS, load_backend
+
+# Reproducible offline inference benchmark. For every backend and thread
+# count it runs the model over dataset/validation and test_image/ and reports
+# accuracy with a per-class confusion matrix, p50/p95/p99 single-image
+# latency, images/sec at several batch sizes, load time and peak RSS.
+# Each (backend, threads) pair runs in its own subprocess so thread settings
+# and RSS don't leak between runs. --tta-views also times test-time
+# augmentation on dataset/validation at each number of views K, decoding
+# included, to show what the extra accuracy costs. --output writes the results as JSON and
+# --compare checks them against an earlier run, e.g.
+#   python benchmark_inference.py --output before.json
+#   ... change something ...
+#   python benchmark_inference.py --compare before.json
+
+
+def class_names(image_dir):
+    return [name for name in sorted(os.listdir(image_dir)) if os.path.isdir(os.path.join(image_dir, name))]
+
+
+def load_image_set(name, image_dir, classes):
+    """
+    Preprocess a set exactly like server.py does uploads. Class directories
+    give the labels; loose files (test_image/) are labelled by file name,
+    e.g. nasi_ayam.jpg -> "nasi ayam", and -1 when it matches no class.
+    Returns (images, labels, file paths).
+    """
+    files, labels = [], []
+    for entry in sorted(os.listdir(image_dir)):
+        path = os.path.join(image_dir, entry)
+        if os.path.isdir(path):
+            for img_name in sorted(os.listdir(path)):
+                files.append(os.path.join(path, img_name))
+                labels.append(classes.index(entry) if entry in classes else -1)
+        else:
+            files.append(path)
+            stem = os.path.splitext(entry)[0].replace('_', ' ').lower()
+            labels.append(classes.index(stem) if stem in classes else -1)
+
+    images, kept_labels, kept_files = [], [], []
+    for path, label in zip(files, labels):
+        if not path.lower().endswith((".jpg", ".jpeg", ".png")):
+            continue
+        with open(path, 'rb') as f:
+            img_array, _ = preprocess_image(f.read())
+        images.append(img_array[0])
+        kept_labels.append(label)
+        kept_files.append(path)
+    if not images:
+        raise SystemExit(f"No images in {image_dir} for the '{name}' set")
+    return np.stack(images), np.array(kept_labels), kept_files
+
+
+def image_sets(model_name):
+    keras_path, validation_dir = MODELS[model_name]
+    classes = class_names(validation_dir)
+    sets = {'validation': load_image_set('validation', validation_dir, classes)}
+    # test_image/ holds main dish photos only
+    if model_name == 'main' and os.path.isdir("test_image"):
+        sets['test_image'] = load_image_set('test_image', "test_image", classes)
+    return classes, sets
+
+
+def measure_throughput(model, images, batch_size, min_images):
+    """
+    Images/sec pushing the set through in batches of batch_size, repeated
+    until at least min_images have been classified
+    """
+    batches = [images[i:i + batch_size] for i in range(0, len(images), batch_size)]
+    done = 0
+    start = time.perf_counter()
+    while done < min_images:
+        for batch in batches:
+            model.predict(batch)
+            done += len(batch)
+    return done / (time.perf_counter() - start)
+
+
+def measure_tta(model, files, k):
+    """
+    Averaged outputs and per-image latencies (decode, k views, one forward
+    pass) for test-time augmentation with k views, like server.py's ?tta=k
+    """
+    outputs, latencies = [], []
+    for path in files:
+        with open(path, 'rb') as f:
+            img_bytes = f.read()
+        start = time.perf_counter()
+        batch, _ = tta.preprocess_views(img_bytes, k)
+        outputs.append(tta.average(model.predict(batch))[0])
+        latencies.append(time.perf_counter() - start)
+    return np.array(outputs), np.array(latencies)
+
+
+def run_worker(backend, model_name, batch_sizes, min_images, tta_views=()):
+    keras_path, _ = MODELS[model_name]
+    classes, sets = image_sets(model_name)
+
+    start = time.perf_counter()
+    model = load_backend(backend, keras_path)
+    load_time = time.perf_counter() - start
+
+    # Warm up every batch shape so tracing and tensor allocation aren't timed
+    all_images = np.concatenate([images for images, _, _ in sets.values()])
+    for batch_size in sorted(set([1] + batch_sizes + list(tta_views))):
+        model.predict(all_images[:batch_size])
+
+    result = {'classes': classes, 'load_time_s': load_time, 'sets': {}}
+    for set_name, (images, labels, _) in sets.items():
+        outputs, latencies = [], []
+        for img_array in images:
+            start = time.perf_counter()
+            outputs.append(np.asarray(model.predict(img_array[np.newaxis]))[0])
+            latencies.append(time.perf_counter() - start)
+        result['sets'][set_name] = {
+            'outputs': np.array(outputs).tolist(),
+            'labels': labels.tolist(),
+            'latencies_ms': (np.array(latencies) * 1000).tolist(),
+        }
+
+    _, labels, files = sets['validation']
+    result['tta'] = {}
+    for k in tta_views:
+        outputs, latencies = measure_tta(model, files, k)
+        result['tta'][str(k)] = {
+            'outputs': outputs.tolist(),
+            'labels': labels.tolist(),
+            'latencies_ms': (latencies * 1000).tolist(),
+        }
+
+    result['images_per_sec'] = {
+        str(batch_size): measure_throughput(model, all_images, batch_size, min_images)
+        for batch_size in batch_sizes
+    }
+    result['peak_rss_mb'] = peak_rss_mb()
+    json.dump(result, sys.stdout)
+
+
+def summarize(result, model_name, reference=None):
+    """
+    Turn a worker's raw outputs into the reported numbers
+    """
+    summary = {
+        'load_time_s': round(result['load_time_s'], 3),
+        'peak_rss_mb': round(result['peak_rss_mb'], 1) if result['peak_rss_mb'] is not None else None,
+        'images_per_sec': {size: round(value, 2) for size, value in result['images_per_sec'].items()},
+        'sets': {},
+    }
+    n_classes = len(result['classes'])
+    for set_name, data in result['sets'].items():
+        outputs = np.array(data['outputs'])
+        labels = np.array(data['labels'])
+        predicted = predicted_labels(outputs, model_name)
+        labelled = labels >= 0
+
+        confusion = np.zeros((n_classes, max(n_classes, 2)), dtype=int)
+        for label, prediction in zip(labels[labelled], predicted[labelled]):
+            confusion[label, prediction] += 1
+
+        latencies = np.array(data['latencies_ms'])
+        set_summary = {
+            'images': len(labels),
+            'accuracy': round(float(np.mean(predicted[labelled] == labels[labelled])), 4) if labelled.any() else None,
+            'confusion': {
+                class_name: {
+                    predicted_class: int(confusion[i, j])
+                    for j, predicted_class in enumerate(result['classes'] + ['other'] * (confusion.shape[1] - n_classes))
+                    if confusion[i, j]
+                }
+                for i, class_name in enumerate(result['classes'])
+            },
+            'latency_ms': {
+                'p50': round(float(np.percentile(latencies, 50)), 3),
+                'p95': round(float(np.percentile(latencies, 95)), 3),
+                'p99': round(float(np.percentile(latencies, 99)), 3),
+            },
+        }
+        if reference is not None:
+            reference_predicted = predicted_labels(np.array(reference['sets'][set_name]['outputs']), model_name)
+            set_summary['agreement_with_keras'] = round(float(np.mean(predicted == reference_predicted)), 4)
+        summary['sets'][set_name] = set_summary
+
+    summary['tta'] = {}
+    for k, data in result.get('tta', {}).items():
+        labels = np.array(data['labels'])
+        predicted = predicted_labels(np.array(data['outputs']), model_name)
+        labelled = labels >= 0
+        latencies = np.array(data['latencies_ms'])
+        summary['tta'][k] = {
+            'accuracy': round(float(np.mean(predicted[labelled] == labels[labelled])), 4) if labelled.any() else None,
+            'latency_ms': {
+                'p50': round(float(np.percentile(latencies, 50)), 3),
+                'p95': round(float(np.percentile(latencies, 95)), 3),
+            },
+        }
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report):
+    print(f"\n{'run':<20} {'set':<11} {'acc':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  images/sec by batch size")
+    for run_name, run in report['runs'].items():
+        throughput = "  ".join(f"{size}:{value:.1f}" for size, value in run['images_per_sec'].items())
+        for set_name, data in run['sets'].items():
+            accuracy = f"{data['accuracy'] * 100:.1f}%" if data['accuracy'] is not None else "n/a"
+            latency = data['latency_ms']
+            print(f"{run_name:<20} {set_name:<11} {accuracy:>7} {latency['p50']:>8.2f} "
+                  f"{latency['p95']:>8.2f} {latency['p99']:>8.2f}  {throughput}")
+        print(f"{'':<20} load {run['load_time_s']:.2f}s, peak RSS {run['peak_rss_mb']} MB")
+
+    if any(run.get('tta') for run in report['runs'].values()):
+        print("\nTest-time augmentation on validation, decoding included:")
+        print(f"{'run':<20} {'views':>5} {'acc':>7} {'p50 ms':>8} {'p95 ms':>8} {'vs 1 view':>9}")
+        for run_name, run in report['runs'].items():
+            one_view = run['tta'].get('1')
+            for k, data in run.get('tta', {}).items():
+                accuracy = f"{data['accuracy'] * 100:.1f}%" if data['accuracy'] is not None else "n/a"
+                latency = data['latency_ms']
+                relative = f"{latency['p50'] / one_view['latency_ms']['p50']:.2f}x" if one_view else "n/a"
+                print(f"{run_name:<20} {k:>5} {accuracy:>7} {latency['p50']:>8.2f} {latency['p95']:>8.2f} {relative:>9}")
+
+    for run_name, run in report['runs'].items():
+        for set_name, data in run['sets'].items():
+            print(f"\n{run_name} / {set_name} confusion (true -> predicted):")
+            for class_name, row in data['confusion'].items():
+                print(f"  {class_name:<12} {row}")
+
+
+def compare(report, baseline, max_slowdown, max_accuracy_drop):
+    """
+    Print the changes against an earlier report; returns the regressions found
+    """
+    regressions = []
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('created_at')}):")
+    for run_name, run in report['runs'].items():
+        old_run = baseline['runs'].get(run_name)
+        if old_run is None:
+            continue
+        for set_name, data in run['sets'].items():
+            old = old_run['sets'].get(set_name)
+            if old is None:
+                continue
+            if data['accuracy'] is not None and old['accuracy'] is not None:
+                drop = old['accuracy'] - data['accuracy']
+                print(f"  {run_name} {set_name} accuracy {old['accuracy']:.4f} -> {data['accuracy']:.4f}")
+                if drop > max_accuracy_drop:
+                    regressions.append(f"{run_name} {set_name} accuracy dropped by {drop:.4f}")
+            old_p95, p95 = old['latency_ms']['p95'], data['latency_ms']['p95']
+            print(f"  {run_name} {set_name} p95 {old_p95:.2f} -> {p95:.2f} ms")
+            if p95 > old_p95 * (1 + max_slowdown):
+                regressions.append(f"{run_name} {set_name} p95 latency {old_p95:.2f} -> {p95:.2f} ms")
+        for size, value in run['images_per_sec'].items():
+            old_value = old_run['images_per_sec'].get(size)
+            if old_value is None:
+                continue
+            print(f"  {run_name} batch {size}: {old_value:.1f} -> {value:.1f} images/sec")
+            if value < old_value * (1 - max_slowdown):
+                regressions.append(f"{run_name} batch {size} throughput {old_value:.1f} -> {value:.1f} images/sec")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline inference benchmark over dataset/validation and test_image/")
+    parser.add_argument("--model", choices=list(MODELS), default='main')
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 4],
+                        help="intra-op / TFLite interpreter thread counts to try")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--min-images", type=int, default=256, help="images classified per throughput measurement")
+    parser.add_argument("--tta-views", nargs="*", type=int, default=[],
+                        help=f"test-time augmentation view counts to measure on validation (1-{tta.MAX_VIEWS}), e.g. 1 2 4 8")
+    parser.add_argument("--output", help="write the report to this JSON file")
+    parser.add_argument("--compare", help="earlier JSON report to check for regressions")
+    parser.add_argument("--max-slowdown", type=float, default=0.10,
+                        help="allowed p95 / throughput regression as a fraction (default 0.10)")
+    parser.add_argument("--max-accuracy-drop", type=float, default=0.0)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    for k in args.tta_views:
+        if not 1 <= k <= tta.MAX_VIEWS:
+            parser.error(f"--tta-views must be between 1 and {tta.MAX_VIEWS}")
+
+    if args.worker:
+        run_worker(args.worker, args.model, args.batch_sizes, args.min_images, args.tta_views)
+        return
+
+    raw = {}
+    for backend in args.backends:
+        for threads in args.threads:
+            run_name = f"{backend}/t{threads}"
+            print(f"🔄 Running {args.model} model: {run_name}...", file=sys.stderr)
+            env = dict(os.environ,
+                       TF_NUM_INTRAOP_THREADS=str(threads),
+                       TF_NUM_INTEROP_THREADS="1",
+                       FDDC_TFLITE_THREADS=str(threads))
+            proc = subprocess.run(
+                [sys.executable, __file__, "--model", args.model, "--worker", backend,
+                 "--batch-sizes", *map(str, args.batch_sizes), "--min-images", str(args.min_images),
+                 "--tta-views", *map(str, args.tta_views)],
+                capture_output=True, text=True, env=env
+            )
+            if proc.returncode != 0:
+                print(f"❌ {run_name} failed:\n{proc.stderr}", file=sys.stderr)
+                continue
+            raw[run_name] = (backend, threads, json.loads(proc.stdout))
+
+    report = {
+        'model': args.model,
+        'commit': git_commit(),
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine(),
+            'cpus': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+        },
+        'runs': {},
+    }
+    for run_name, (backend, threads, result) in raw.items():
+        reference = raw.get(f"keras/t{threads}")
+        reference = reference[2] if reference is not None and backend != 'keras' else None
+        report['runs'][run_name] = {
+            'backend': backend,
+            'threads': threads,
+            **summarize(result, args.model, reference),
+        }
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.max_slowdown, args.max_accuracy_drop)
+        if regressions:
+            print("\n❌ Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
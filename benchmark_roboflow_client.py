@@ -0,0 +1,119 @@
+import argparse
+import base64
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+from fake_roboflow_server import start_fake_roboflow
+from roboflow_client import CircuitBreaker, RoboflowClient, RoboflowError
+
+# Offline benchmark of side dish detection against fake_roboflow_server:
+#   old    - requests.post with a new connection per call, run after inference
+#   client - pooled RoboflowClient started alongside inference
+# Main model inference is simulated with a sleep of --inference-ms.
+
+
+def old_detect(url, api_key, image_bytes):
+    response = requests.post(
+        f"{url}?api_key={api_key}",
+        data=base64.b64encode(image_bytes).decode("utf-8"),
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    return response.json() if response.status_code == 200 else []
+
+
+def run_load(handle_request, total_requests, concurrency):
+    latencies = []
+    lock = threading.Lock()
+
+    def timed(_):
+        start = time.perf_counter()
+        handle_request()
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, range(total_requests)))
+    wall = time.perf_counter() - wall_start
+
+    latencies_ms = np.array(latencies) * 1000
+    return total_requests / wall, np.percentile(latencies_ms, 50), np.percentile(latencies_ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Roboflow client against a local fake API")
+    parser.add_argument("--image", default="test_image/nasi_lemak.jpg")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="fake API latency")
+    parser.add_argument("--inference-ms", type=float, default=80.0, help="simulated main model time")
+    parser.add_argument("--failure-rate", type=float, default=0.3, help="503 rate for the failure run")
+    args = parser.parse_args()
+
+    image_bytes = open(args.image, "rb").read()
+    inference = args.inference_ms / 1000.0
+    server, base_url = start_fake_roboflow(latency_ms=args.latency_ms)
+    model_url = f"{base_url}/ingredient-2kc8g/2"
+
+    def old_request():
+        time.sleep(inference)
+        old_detect(model_url, "key", image_bytes)
+
+    client = RoboflowClient(base_url, "key", "ingredient-2kc8g", "2", pool_size=args.concurrency)
+    executor = ThreadPoolExecutor(max_workers=args.concurrency)
+
+    def client_request():
+        future = executor.submit(client.detect, image_bytes)
+        time.sleep(inference)
+        future.result()
+
+    print(f"{'path':<34} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, handler in [("old (sequential, no keep-alive)", old_request),
+                           ("client (pooled, concurrent)", client_request)]:
+        rps, p50, p99 = run_load(handler, args.requests, args.concurrency)
+        print(f"{label:<34} {rps:>8.1f} {p50:>8.1f} {p99:>8.1f}")
+
+    # Failing upstream: retries absorb transient 503s, the breaker stops
+    # hammering a dead service and the server falls back to the local model
+    server.settings['failure_rate'] = args.failure_rate
+    client = RoboflowClient(base_url, "key", "ingredient-2kc8g", "2", backoff=0.05,
+                            pool_size=args.concurrency,
+                            breaker=CircuitBreaker(failure_threshold=5, reset_timeout=1.0))
+    outcomes = {'ok': 0, 'fallback': 0}
+    outcomes_lock = threading.Lock()
+
+    def failing_request():
+        try:
+            client.detect(image_bytes)
+            outcome = 'ok'
+        except RoboflowError:
+            outcome = 'fallback'
+        with outcomes_lock:
+            outcomes[outcome] += 1
+
+    rps, p50, p99 = run_load(failing_request, args.requests, args.concurrency)
+    print(f"{f'client, {args.failure_rate:.0%} upstream 503s':<34} {rps:>8.1f} {p50:>8.1f} {p99:>8.1f}"
+          f"   ok={outcomes['ok']} fallback={outcomes['fallback']}")
+
+    server.settings['failure_rate'] = 1.0
+    for _ in range(10):
+        try:
+            client.detect(image_bytes)
+        except RoboflowError:
+            pass
+    start = time.perf_counter()
+    try:
+        client.detect(image_bytes)
+    except RoboflowError as e:
+        print(f"\nUpstream down: breaker {client.breaker.state}, next call failed fast in "
+              f"{(time.perf_counter() - start) * 1000:.2f} ms ({e})")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
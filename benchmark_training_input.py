@@ -0,0 +1,98 @@
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import argparse
+import shutil
+import time
+
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+import training_data
+
+# Epoch-time comparison of the old ImageDataGenerator input and the tf.data
+# pipeline in training_data.py. Only the input side is timed (every batch of
+# an epoch is produced and discarded), so the numbers show how long the model
+# would wait for data each epoch.
+
+DATASETS = {
+    'main': ("dataset/train", 'categorical'),
+    'side': ("dataset_side_dishes/train", 'binary'),
+}
+
+
+def generator_epoch_times(directory, class_mode, epochs, batch_size):
+    datagen = ImageDataGenerator(
+        rescale=1.0/255,
+        rotation_range=40,
+        width_shift_range=0.3,
+        height_shift_range=0.3,
+        shear_range=0.3,
+        zoom_range=0.3,
+        horizontal_flip=True,
+    )
+    generator = datagen.flow_from_directory(
+        directory,
+        target_size=training_data.IMG_SIZE,
+        batch_size=batch_size,
+        class_mode=class_mode
+    )
+    times = []
+    for _ in range(epochs):
+        start = time.perf_counter()
+        for _ in range(len(generator)):
+            next(generator)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def dataset_epoch_times(directory, label_mode, epochs, batch_size, cache):
+    dataset, _ = training_data.make_dataset(
+        directory, label_mode=label_mode, batch_size=batch_size, augment=True, cache=cache
+    )
+    times = []
+    for _ in range(epochs):
+        start = time.perf_counter()
+        for _ in dataset:
+            pass
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def later_epochs_mean(times):
+    """
+    Mean of the epochs after the first (which pays for filling any cache)
+    """
+    later = times[1:] or times
+    return sum(later) / len(later)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ImageDataGenerator vs. tf.data epoch times")
+    parser.add_argument("--dataset", choices=sorted(DATASETS), action="append",
+                        help="dataset to time (default: both)")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=training_data.BATCH_SIZE)
+    args = parser.parse_args()
+
+    for name in args.dataset or sorted(DATASETS):
+        directory, label_mode = DATASETS[name]
+        # Start the file cache cold so its first epoch includes filling it
+        shutil.rmtree(training_data.CACHE_DIR, ignore_errors=True)
+
+        results = {
+            'ImageDataGenerator': generator_epoch_times(directory, label_mode, args.epochs, args.batch_size),
+            'tf.data': dataset_epoch_times(directory, label_mode, args.epochs, args.batch_size, None),
+            'tf.data + memory cache': dataset_epoch_times(directory, label_mode, args.epochs, args.batch_size, True),
+            'tf.data + file cache': dataset_epoch_times(directory, label_mode, args.epochs, args.batch_size, 'file'),
+        }
+
+        baseline = later_epochs_mean(results['ImageDataGenerator'])
+        print(f"\n📊 {name} ({directory}), {args.epochs} epochs")
+        print(f"{'pipeline':<24} {'epoch 1 s':>10} {'later s':>9} {'speedup':>8}")
+        for pipeline, times in results.items():
+            later_mean = later_epochs_mean(times)
+            print(f"{pipeline:<24} {times[0]:>10.2f} {later_mean:>9.2f} {baseline / later_mean:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
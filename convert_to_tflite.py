@@ -1,23 +1,83 @@
 import tensorflow as tf
+import numpy as np
+import argparse
+import glob
 import os
+from PIL import Image
+
+from model_backends import backend_model_path
 
 # Ensure TF warnings are minimal
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
-def convert_to_tflite():
-    # Load the Keras model
-    model = tf.keras.models.load_model("food_classification_model.keras")
-    
-    # Convert to TFLite
+# Models served by server.py and the images used to calibrate int8 quantization
+SERVER_MODELS = {
+    "food_classification_model.keras": "dataset/train",
+    "nasi_lemak_side_dishes_model.keras": "dataset_side_dishes/train",
+    "food_multihead_model.keras": "dataset/train",
+}
+
+def representative_dataset(image_dir, num_samples=100):
+    """
+    Yield preprocessed training images so the converter can calibrate
+    int8 activation ranges
+    """
+    image_paths = sorted(
+        path for path in glob.glob(os.path.join(image_dir, "*", "*"))
+        if path.lower().endswith((".jpg", ".jpeg", ".png"))
+    )
+    step = max(1, len(image_paths) // num_samples)
+    for image_path in image_paths[::step][:num_samples]:
+        img = Image.open(image_path).convert("RGB").resize((224, 224))
+        img_array = np.asarray(img, dtype=np.float32) / 255.0
+        yield [np.expand_dims(img_array, axis=0)]
+
+def convert_model(keras_path, output_path, quantization=None, image_dir=None):
+    """
+    Convert a Keras model to TFLite, optionally quantized to float16 or int8
+    """
+    model = tf.keras.models.load_model(keras_path)
     converter = tf.lite.TFLiteConverter.from_keras_model(model)
+
+    if quantization == "fp16":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == "int8":
+        # Int8 weights and activations; inputs and outputs stay float32
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: representative_dataset(image_dir)
+
     tflite_model = converter.convert()
-    
-    # Save the TFLite model
-    output_path = "flutter/food_classifier_app/assets/models/food_model.tflite"
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
     with open(output_path, 'wb') as f:
         f.write(tflite_model)
     print(f"Model converted and saved to {output_path}")
 
+def convert_to_tflite():
+    # Float model bundled with the Flutter app
+    convert_model(
+        "food_classification_model.keras",
+        "flutter/food_classifier_app/assets/models/food_model.tflite"
+    )
+
+def convert_server_models():
+    # Every backend variant of each server model, next to the .keras files
+    for keras_path, image_dir in SERVER_MODELS.items():
+        if not os.path.exists(keras_path):
+            print(f"Skipping {keras_path}: file not found")
+            continue
+        convert_model(keras_path, backend_model_path(keras_path, "tflite"))
+        convert_model(keras_path, backend_model_path(keras_path, "tflite-fp16"), "fp16")
+        convert_model(keras_path, backend_model_path(keras_path, "tflite-int8"), "int8", image_dir)
+
 if __name__ == "__main__":
-    convert_to_tflite()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Convert Keras models to TFLite")
+    parser.add_argument("--server", action="store_true",
+                        help="export float32/fp16/int8 variants of the server models")
+    args = parser.parse_args()
+
+    if args.server:
+        convert_server_models()
+    else:
+        convert_to_tflite()
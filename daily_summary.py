@@ -0,0 +1,109 @@
+import argparse
+from datetime import date, timedelta
+
+from db_pool import db_session
+
+# Per-user daily nutrition totals, kept in user_daily_summaries (see
+# add_daily_summaries.sql). Every food_predictions insert adds its meal here
+# in the same transaction; rebuild() recomputes the table from the history.
+
+NUTRIENTS = ('calories', 'protein', 'carbs', 'fats')
+
+
+def record_meal(cursor, user_id, nutrition, day=None):
+    """
+    Add one meal to the user's summary for day (the database's current date
+    when None). nutrition is the category's nutrition dict, or None when the
+    category has no food_info row. The caller commits.
+    """
+    nutrition = nutrition or {}
+    values = [float(nutrition.get(field) or 0) for field in NUTRIENTS]
+    cursor.execute("""
+        INSERT INTO user_daily_summaries
+        (user_id, day, calories, protein, carbs, fats, meal_count)
+        VALUES (%s, COALESCE(%s, CURDATE()), %s, %s, %s, %s, 1)
+        ON DUPLICATE KEY UPDATE
+            calories = calories + VALUES(calories),
+            protein = protein + VALUES(protein),
+            carbs = carbs + VALUES(carbs),
+            fats = fats + VALUES(fats),
+            meal_count = meal_count + 1
+    """, (user_id, day, *values))
+
+
+def fetch_summary(cursor, user_id, start, end):
+    """
+    One entry per day from start to end inclusive; days without meals are zero
+    """
+    cursor.execute("""
+        SELECT day, calories, protein, carbs, fats, meal_count
+        FROM user_daily_summaries
+        WHERE user_id = %s AND day BETWEEN %s AND %s
+        ORDER BY day
+    """, (user_id, start, end))
+    rows = {row['day']: row for row in cursor.fetchall()}
+
+    days = []
+    day = start
+    while day <= end:
+        row = rows.get(day)
+        entry = {'date': day.isoformat()}
+        for field in NUTRIENTS:
+            entry[field] = float(row[field]) if row else 0.0
+        entry['meal_count'] = row['meal_count'] if row else 0
+        days.append(entry)
+        day += timedelta(days=1)
+    return days
+
+
+def rebuild(conn, user_id=None):
+    """
+    Recompute the summaries from food_predictions, for one user or everyone.
+    Returns the number of summary rows written.
+    """
+    cursor = conn.cursor()
+    if user_id is not None:
+        where, params = "WHERE p.user_id = %s", (user_id,)
+        cursor.execute("DELETE FROM user_daily_summaries WHERE user_id = %s", params)
+    else:
+        where, params = "", ()
+        cursor.execute("DELETE FROM user_daily_summaries")
+    cursor.execute(f"""
+        INSERT INTO user_daily_summaries
+        (user_id, day, calories, protein, carbs, fats, meal_count)
+        SELECT
+            p.user_id,
+            DATE(p.created_at),
+            COALESCE(SUM(fi.calories), 0),
+            COALESCE(SUM(fi.protein), 0),
+            COALESCE(SUM(fi.carbs), 0),
+            COALESCE(SUM(fi.fats), 0),
+            COUNT(*)
+        FROM food_predictions p
+        LEFT JOIN food_info fi ON p.food_category_id = fi.food_category_id
+        {where}
+        GROUP BY p.user_id, DATE(p.created_at)
+    """, params)
+    written = cursor.rowcount
+    conn.commit()
+    cursor.close()
+    return written
+
+
+def parse_day(value, default):
+    """
+    Parse a YYYY-MM-DD query parameter; raises ValueError on bad input
+    """
+    if not value:
+        return default
+    return date.fromisoformat(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild user_daily_summaries from the prediction history")
+    parser.add_argument("--user-id", type=int, help="only rebuild this user (default: everyone)")
+    args = parser.parse_args()
+
+    with db_session() as conn:
+        written = rebuild(conn, args.user_id)
+    print(f"✅ Rebuilt {written} daily summary rows")
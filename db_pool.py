@@ -0,0 +1,132 @@
+import os
+import threading
+from contextlib import contextmanager
+
+import logging
+
+import mysql.connector
+from mysql.connector import errors, pooling
+
+DB_CONFIG = {
+    'host': os.environ.get('FDDC_DB_HOST', 'localhost'),
+    'user': os.environ.get('FDDC_DB_USER', 'root'),
+    'password': os.environ.get('FDDC_DB_PASSWORD', ''),
+    'database': os.environ.get('FDDC_DB_NAME', 'food_classifier_db'),
+}
+
+# mysql (default) or sqlite, the stand-in used for load tests (sqlite_db.py)
+DB_BACKEND = os.environ.get('FDDC_DB_BACKEND', 'mysql')
+SQLITE_PATH = os.environ.get('FDDC_SQLITE_PATH', 'fddc_standin.db')
+
+# Connections kept open per process; 0 opens a fresh connection every time.
+# mysql-connector caps a pool at 32 connections.
+POOL_SIZE = min(int(os.environ.get('FDDC_DB_POOL_SIZE', '8')), pooling.CNX_POOL_MAXSIZE)
+
+# How long a request waits for a free pooled connection before failing
+POOL_TIMEOUT = float(os.environ.get('FDDC_DB_POOL_TIMEOUT', '5'))
+
+log = logging.getLogger(__name__)
+
+_pool = None
+_pool_slots = None
+_pool_lock = threading.Lock()
+_in_use = 0
+
+
+class PoolTimeoutError(errors.PoolError):
+    pass
+
+
+def get_pool():
+    global _pool, _pool_slots
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool_slots = threading.BoundedSemaphore(POOL_SIZE)
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name="fddc",
+                    pool_size=POOL_SIZE,
+                    pool_reset_session=True,
+                    **DB_CONFIG
+                )
+                log.info("Database pool ready (%d connections)", POOL_SIZE)
+    return _pool
+
+
+def get_connection():
+    """
+    Check a connection out of the pool, waiting up to POOL_TIMEOUT seconds
+    for one to be free. The pool pings each connection on checkout and
+    reconnects it if the server dropped it. Always hand the connection back
+    with release_connection (or use db_session).
+    """
+    global _in_use
+    if DB_BACKEND == 'sqlite':
+        import sqlite_db
+        return sqlite_db.connect(SQLITE_PATH, timeout=POOL_TIMEOUT)
+    if POOL_SIZE <= 0:
+        return mysql.connector.connect(**DB_CONFIG)
+
+    pool = get_pool()
+    if not _pool_slots.acquire(timeout=POOL_TIMEOUT):
+        raise PoolTimeoutError(f"No database connection free after {POOL_TIMEOUT}s")
+    try:
+        conn = pool.get_connection()
+    except Exception:
+        _pool_slots.release()
+        raise
+    with _pool_lock:
+        _in_use += 1
+    return conn
+
+
+def release_connection(conn):
+    """
+    Roll back anything left uncommitted and return the connection to the pool
+    """
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except errors.Error:
+        pass
+    finally:
+        _return_to_pool(conn)
+
+
+def _return_to_pool(conn):
+    global _in_use
+    pooled = isinstance(conn, pooling.PooledMySQLConnection)
+    try:
+        conn.close()
+    finally:
+        if pooled:
+            with _pool_lock:
+                _in_use -= 1
+            _pool_slots.release()
+
+
+@contextmanager
+def db_session():
+    """
+    A pooled connection for code that runs outside a Flask request
+    """
+    conn = get_connection()
+    try:
+        yield conn
+    finally:
+        release_connection(conn)
+
+
+def check_health():
+    """
+    Run a trivial query on a pooled connection; raises if the database is unreachable
+    """
+    with db_session() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+
+
+def pool_status():
+    return {'size': POOL_SIZE if DB_BACKEND == 'mysql' else 0, 'in_use': _in_use}
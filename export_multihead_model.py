@@ -0,0 +1,91 @@
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import glob
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import GlobalAveragePooling2D
+from tensorflow.keras.models import Model
+
+from image_pipeline import preprocess_image
+
+# Both classifiers are small heads on the same frozen ImageNet MobileNetV2.
+# This combines them into one model that computes the backbone once and
+# evaluates both heads on the pooled features: outputs are [main, side_dishes].
+
+MAIN_MODEL_PATH = "food_classification_model.keras"
+SIDE_DISHES_MODEL_PATH = "nasi_lemak_side_dishes_model.keras"
+OUTPUT_PATH = "food_multihead_model.keras"
+
+
+def pooling_index(model):
+    """
+    Index of the GlobalAveragePooling2D layer that separates the backbone
+    from the head
+    """
+    for i, layer in enumerate(model.layers):
+        if isinstance(layer, GlobalAveragePooling2D):
+            return i
+    raise ValueError(f"{model.name} has no GlobalAveragePooling2D layer")
+
+
+def backbones_match(main_model, side_model):
+    main_weights = [w for layer in main_model.layers[:pooling_index(main_model)] for w in layer.get_weights()]
+    side_weights = [w for layer in side_model.layers[:pooling_index(side_model)] for w in layer.get_weights()]
+    if len(main_weights) != len(side_weights):
+        return False
+    return all(a.shape == b.shape and np.allclose(a, b) for a, b in zip(main_weights, side_weights))
+
+
+def build_multihead_model(main_model, side_model):
+    pooled = main_model.layers[pooling_index(main_model)].output
+
+    # Copy the side-dish head onto the shared features. The layers are
+    # rebuilt under new names because both models use Keras' default
+    # names (dense, dense_1, ...), which must be unique in one model.
+    x = pooled
+    for layer in side_model.layers[pooling_index(side_model) + 1:]:
+        config = layer.get_config()
+        config['name'] = f"side_dishes_{config['name']}"
+        head_layer = layer.__class__.from_config(config)
+        x = head_layer(x)
+        head_layer.set_weights(layer.get_weights())
+
+    return Model(inputs=main_model.input, outputs=[main_model.output, x], name="food_multihead")
+
+
+def verify(multihead_model, main_model, side_model):
+    """
+    Compare the combined model with the two originals on the test images
+    """
+    image_paths = sorted(glob.glob("test_image/*"))
+    if not image_paths:
+        print("⚠️ No test images found, skipping verification")
+        return
+    batch = np.concatenate([preprocess_image(open(path, "rb").read())[0] for path in image_paths])
+
+    main_out, side_out = multihead_model.predict_on_batch(batch)
+    main_diff = np.max(np.abs(main_out - main_model.predict_on_batch(batch)))
+    side_diff = np.max(np.abs(side_out - side_model.predict_on_batch(batch)))
+    print(f"📊 Max difference vs. separate models on {len(batch)} images: "
+          f"main {main_diff:.6f}, side dishes {side_diff:.6f}")
+
+
+def main():
+    main_model = tf.keras.models.load_model(MAIN_MODEL_PATH)
+    side_model = tf.keras.models.load_model(SIDE_DISHES_MODEL_PATH)
+
+    if not backbones_match(main_model, side_model):
+        print("⚠️ The MobileNetV2 backbones differ; the side-dish head will run on the "
+              "main model's backbone features, so check the verification numbers below")
+
+    multihead_model = build_multihead_model(main_model, side_model)
+    verify(multihead_model, main_model, side_model)
+
+    multihead_model.save(OUTPUT_PATH)
+    print(f"✅ Multi-head model saved as '{OUTPUT_PATH}'")
+
+
+if __name__ == "__main__":
+    main()
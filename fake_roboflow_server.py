@@ -0,0 +1,86 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Roboflow hosted detection API, for testing and
+# benchmarking offline. Point the server at it with
+#   FDDC_ROBOFLOW_API_URL=http://localhost:9001 python server.py
+
+CANNED_PREDICTIONS = [
+    {"x": 320, "y": 180, "width": 140, "height": 90, "class": "Anchovies", "confidence": 0.91},
+    {"x": 420, "y": 260, "width": 120, "height": 110, "class": "Boiled-Egg", "confidence": 0.87},
+    {"x": 210, "y": 300, "width": 100, "height": 80, "class": "Sambal", "confidence": 0.78},
+    {"x": 480, "y": 120, "width": 90, "height": 60, "class": "Cucumber", "confidence": 0.72},
+    {"x": 260, "y": 110, "width": 80, "height": 50, "class": "Peanuts", "confidence": 0.64},
+]
+
+
+class FakeRoboflowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        settings = self.server.settings
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        roll = random.random()
+        if roll < settings['timeout_rate']:
+            time.sleep(settings['hang_seconds'])
+        elif roll < settings['timeout_rate'] + settings['failure_rate']:
+            self._send(503, {"message": "Service Unavailable"})
+            return
+
+        time.sleep(settings['latency_ms'] / 1000.0)
+        self._send(200, {
+            "time": settings['latency_ms'] / 1000.0,
+            "image": {"width": 640, "height": 480},
+            "predictions": CANNED_PREDICTIONS,
+        })
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_roboflow(port=0, latency_ms=150.0, failure_rate=0.0, timeout_rate=0.0, hang_seconds=30.0):
+    """
+    Start the fake API on a background thread; returns (server, base_url).
+    Call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeRoboflowHandler)
+    server.daemon_threads = True
+    server.settings = {
+        'latency_ms': latency_ms,
+        'failure_rate': failure_rate,
+        'timeout_rate': timeout_rate,
+        'hang_seconds': hang_seconds,
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Roboflow detection API")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of 503 responses")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of requests that hang")
+    args = parser.parse_args()
+
+    server, url = start_fake_roboflow(args.port, args.latency_ms, args.failure_rate, args.timeout_rate)
+    print(f"✅ Fake Roboflow API listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
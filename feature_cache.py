@@ -0,0 +1,165 @@
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import argparse
+import hashlib
+import json
+import time
+
+import numpy as np
+import tensorflow as tf
+
+import training_data
+
+# Both classifiers train only a small head on a frozen ImageNet MobileNetV2,
+# so the backbone's pooled features for an image never change. This runs the
+# backbone once per image and keeps the 1280-d features in a memory-mapped
+# .npy file, next to a JSON index of source paths, content hashes and labels.
+# Later runs reuse the rows of unchanged images and only run the backbone on
+# new or edited ones; train_head.py trains heads straight from these files.
+
+CACHE_DIR = ".feature_cache"
+BACKBONE = "mobilenet_v2_imagenet_avg"
+FEATURE_DIM = 1280
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_paths(directory, img_size=training_data.IMG_SIZE):
+    """
+    (features .npy path, index .json path) for an image directory
+    """
+    name = directory.strip("/\\").replace("/", "_").replace("\\", "_").replace(" ", "_")
+    base = os.path.join(CACHE_DIR, f"{name}_{img_size[0]}x{img_size[1]}")
+    return f"{base}_features.npy", f"{base}_index.json"
+
+
+_backbones = {}
+
+
+def get_backbone(img_size=training_data.IMG_SIZE):
+    """
+    The frozen backbone the training scripts use, ending in the same
+    global average pooling their heads start from (built once per size)
+    """
+    if img_size not in _backbones:
+        _backbones[img_size] = tf.keras.applications.MobileNetV2(
+            input_shape=(*img_size, 3), include_top=False, weights="imagenet", pooling="avg"
+        )
+    return _backbones[img_size]
+
+
+def _load_index(index_path):
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('backbone') == BACKBONE else None
+
+
+def update_cache(directory, img_size=training_data.IMG_SIZE, batch_size=training_data.BATCH_SIZE):
+    """
+    Bring the feature cache for directory/<class>/ up to date. Features of
+    images whose content hash is already cached are copied over; only new or
+    changed images go through the backbone.
+    Returns (features path, index path, number of images computed)
+    """
+    paths, labels, class_names = training_data.list_image_files(directory)
+    hashes = [file_hash(path) for path in paths]
+    features_path, index_path = cache_paths(directory, img_size)
+
+    cached_rows = {}
+    cached_features = None
+    index = _load_index(index_path)
+    if index is not None and os.path.exists(features_path):
+        cached_features = np.load(features_path, mmap_mode='r')
+        if cached_features.shape != (len(index['files']), FEATURE_DIM):
+            # The index and features were left out of step (an interrupted run)
+            cached_features, index = None, None
+        else:
+            cached_rows = {entry['sha1']: row for row, entry in enumerate(index['files'])}
+
+    if index is not None and cached_features is not None and index['class_names'] == class_names \
+            and [(e['sha1'], e['label']) for e in index['files']] == list(zip(hashes, labels)):
+        return features_path, index_path, 0
+    missing = [i for i, sha1 in enumerate(hashes) if sha1 not in cached_rows]
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = features_path + ".tmp.npy"
+    features = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float32,
+                                         shape=(len(paths), FEATURE_DIM))
+    for i, sha1 in enumerate(hashes):
+        if sha1 in cached_rows:
+            features[i] = cached_features[cached_rows[sha1]]
+
+    if missing:
+        backbone = get_backbone(img_size)
+        row = 0
+        for batch in training_data.image_batches([paths[i] for i in missing], batch_size, img_size):
+            computed = backbone(batch, training=False).numpy()
+            features[missing[row:row + len(computed)]] = computed
+            row += len(computed)
+    features.flush()
+    del features, cached_features
+    os.replace(tmp_path, features_path)
+
+    with open(index_path, 'w') as f:
+        json.dump({
+            'backbone': BACKBONE,
+            'img_size': list(img_size),
+            'class_names': class_names,
+            'files': [
+                {'path': path, 'sha1': sha1, 'label': label}
+                for path, sha1, label in zip(paths, hashes, labels)
+            ],
+        }, f, indent=1)
+    return features_path, index_path, len(missing)
+
+
+def load_features(directory, img_size=training_data.IMG_SIZE):
+    """
+    Update the cache if needed and return (features memmap, labels, class names)
+    """
+    features_path, index_path, _ = update_cache(directory, img_size)
+    with open(index_path) as f:
+        index = json.load(f)
+    labels = np.array([entry['label'] for entry in index['files']], dtype=np.int32)
+    return np.load(features_path, mmap_mode='r'), labels, index['class_names']
+
+
+def feature_rows(directory, paths, img_size=training_data.IMG_SIZE):
+    """
+    Cached features of specific images under directory, in the order of paths
+    """
+    features_path, index_path, _ = update_cache(directory, img_size)
+    with open(index_path) as f:
+        rows = {os.path.normpath(entry['path']): row for row, entry in enumerate(json.load(f)['files'])}
+    missing = [path for path in paths if os.path.normpath(path) not in rows]
+    if missing:
+        raise ValueError(f"{len(missing)} images are not under a class folder of {directory}, e.g. {missing[0]}")
+    features = np.load(features_path, mmap_mode='r')
+    return features[[rows[os.path.normpath(path)] for path in paths]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute frozen MobileNetV2 features for image directories")
+    parser.add_argument("directories", nargs="+", help="directories laid out as <dir>/<class>/<image>")
+    args = parser.parse_args()
+
+    for directory in args.directories:
+        start = time.perf_counter()
+        features_path, _, computed = update_cache(directory)
+        count = np.load(features_path, mmap_mode='r').shape[0]
+        print(f"✅ {directory}: {count} images, {computed} computed, {count - computed} reused "
+              f"({time.perf_counter() - start:.1f}s) -> {features_path}")
+
+
+if __name__ == "__main__":
+    main()
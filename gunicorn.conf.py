@@ -0,0 +1,35 @@
+import os
+
+# Production serving for server.py:
+#   gunicorn -c gunicorn.conf.py
+#
+# The master imports server.py once (preload_app) and forks the workers from
+# it, so Flask, numpy and TensorFlow's Python modules are shared copy-on-write
+# instead of imported per worker. The models themselves are loaded in each
+# worker after the fork: a TensorFlow runtime (or a TFLite interpreter's thread
+# pool) started in the master does not survive fork and deadlocks the
+# children. The .tflite backends memory-map the model file, so their weights
+# are still shared between workers through the page cache.
+#
+# Each worker runs FDDC_THREADS request threads against one copy of the
+# models; concurrent requests in a worker are batched into one model call
+# (FDDC_BATCH_MAX_SIZE), so prefer more threads over more workers.
+
+os.environ['FDDC_LOAD_MODELS_AT_IMPORT'] = '0'
+
+wsgi_app = 'server:app'
+bind = os.environ.get('FDDC_BIND', '0.0.0.0:5001')
+workers = int(os.environ.get('FDDC_WORKERS', '2'))
+worker_class = 'gthread'
+threads = int(os.environ.get('FDDC_THREADS', '8'))
+preload_app = True
+# With FDDC_MODEL_LOADING=eager, loading TensorFlow and the models happens
+# before a worker's first heartbeat, so allow for it
+timeout = int(os.environ.get('FDDC_WORKER_TIMEOUT', '120'))
+graceful_timeout = 30
+keepalive = 5
+
+
+def post_worker_init(worker):
+    import server
+    server.start_models()
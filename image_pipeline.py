@@ -0,0 +1,107 @@
+import base64
+import io
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+# Input size of the MobileNetV2 based classifiers
+IMG_SIZE = (224, 224)
+
+log = logging.getLogger(__name__)
+
+# Uploads are written to disk by this pool, off the request thread
+_save_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-save")
+
+
+class ImageProcessingError(Exception):
+    pass
+
+
+def decode_base64_image(img_data):
+    """
+    Decode a base64 image string, with or without a data URI prefix
+    """
+    if "," in img_data:
+        img_data = img_data.split(",", 1)[1]
+    return base64.b64decode(img_data)
+
+
+def decode_image(img_bytes, size=IMG_SIZE):
+    """
+    Decode image bytes into an RGB PIL image. JPEGs are decoded in draft
+    mode, which lets libjpeg downscale by 1/2, 1/4 or 1/8 while decoding
+    (never below the requested size) instead of decoding the full photo.
+    Returns the image and its original format.
+    """
+    img = Image.open(io.BytesIO(img_bytes))
+    img_format = img.format
+    if img_format == 'JPEG':
+        img.draft('RGB', size)
+    return img.convert('RGB'), img_format
+
+
+def image_size(img_bytes):
+    """
+    (width, height) of an image, read from its header without decoding it
+    """
+    with Image.open(io.BytesIO(img_bytes)) as img:
+        return img.size
+
+
+def to_tensor(img, size=IMG_SIZE):
+    """
+    Resize a PIL image and return the normalized float32 batch of one
+    the classifiers expect
+    """
+    img_array = np.asarray(img.resize(size), dtype=np.float32)
+    img_array *= 1.0 / 255.0
+    return img_array[np.newaxis]
+
+
+def preprocess_image(img_bytes, size=IMG_SIZE):
+    """
+    Decode once from the request bytes straight to the model input tensor.
+    Returns the tensor and the original image format.
+    """
+    img, img_format = decode_image(img_bytes, size)
+    return to_tensor(img, size), img_format
+
+
+def save_image(img_bytes, image_path):
+    """
+    Persist an upload as JPEG. JPEG bytes are written untouched, other
+    formats are re-encoded.
+    """
+    os.makedirs(os.path.dirname(image_path) or ".", exist_ok=True)
+    if img_bytes[:3] == b'\xff\xd8\xff':  # JPEG magic number
+        with open(image_path, 'wb') as f:
+            f.write(img_bytes)
+    else:
+        img = Image.open(io.BytesIO(img_bytes)).convert('RGB')
+        img.save(image_path, 'JPEG', quality=90)
+
+
+def save_image_async(img_bytes, image_path, observe=None):
+    """
+    Persist an upload in the background; returns a Future. observe, if
+    given, is called with the seconds the write took.
+    """
+    future = _save_executor.submit(_timed_save, img_bytes, image_path, observe)
+    future.add_done_callback(_report_save_error)
+    return future
+
+
+def _timed_save(img_bytes, image_path, observe):
+    start = time.perf_counter()
+    save_image(img_bytes, image_path)
+    if observe is not None:
+        observe(time.perf_counter() - start)
+
+
+def _report_save_error(future):
+    if future.exception() is not None:
+        log.error("Error saving uploaded image: %s", future.exception())
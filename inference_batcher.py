@@ -0,0 +1,108 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class InferenceBatcher:
+    """
+    Collects concurrent prediction requests into batches and runs them
+    through a single model call, then hands each caller its own rows back.
+
+    predict_fn receives one stacked batch and returns either an array or a
+    list/tuple of arrays (multi-output models), each with the batch as the
+    first dimension.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=8, max_wait_ms=5.0, name="batcher"):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._carry = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, img_array):
+        """
+        Queue an array of shape (n, ...) and return a Future that resolves to
+        the model output for those n rows.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((img_array, future))
+        return future
+
+    def predict(self, img_array, timeout=None):
+        return self.submit(img_array).result(timeout=timeout)
+
+    def _ensure_started(self):
+        # The worker thread is started lazily so the batcher can be created
+        # before a fork (e.g. a preloading WSGI master) and still work in
+        # each child process.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._carry = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _next_item(self, timeout=None):
+        if self._carry is not None:
+            item, self._carry = self._carry, None
+            return item
+        return self._queue.get(timeout=timeout)
+
+    def _run(self):
+        while True:
+            items = [self._next_item()]
+            rows = len(items[0][0])
+            deadline = time.perf_counter() + self.max_wait
+
+            while rows < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._next_item(timeout=remaining)
+                except queue.Empty:
+                    break
+                if rows + len(item[0]) > self.max_batch_size:
+                    # Doesn't fit; it opens the next batch instead
+                    self._carry = item
+                    break
+                items.append(item)
+                rows += len(item[0])
+
+            self._run_batch(items)
+
+    def _run_batch(self, items):
+        try:
+            if len(items) == 1:
+                batch = items[0][0]
+            else:
+                batch = np.concatenate([img_array for img_array, _ in items], axis=0)
+            outputs = self.predict_fn(batch)
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+
+        start = 0
+        for img_array, future in items:
+            end = start + len(img_array)
+            if isinstance(outputs, (list, tuple)):
+                future.set_result([np.asarray(output)[start:end] for output in outputs])
+            else:
+                future.set_result(np.asarray(outputs)[start:end])
+            start = end
@@ -0,0 +1,115 @@
+import json
+
+# Which side dish stages a prediction runs, decided from the main model's
+# answer. A route is an ordered list of stages, each tried only when the ones
+# before it failed: 'roboflow' (hosted API), 'detector' (the local object
+# detector) or 'local' (the multi-label side dish classifier). An empty route
+# skips side dish detection altogether. 'default' stands for the configured
+# FDDC_SIDE_DISH_SOURCE followed by the local classifier.
+#
+# Rules come from a JSON file (FDDC_CASCADE_RULES) shaped like DEFAULT_RULES:
+# "routes" maps lower-case class names to routes, with "*" for every other
+# class. Below "min_confidence" the main model's class can't be trusted to
+# pick a route, so the "uncertain" route is used instead.
+
+STAGES = ('roboflow', 'detector', 'local')
+
+# Side dishes are nasi lemak side dishes: skip them for confident answers
+# for the other dishes, and run them whenever the main model is unsure
+DEFAULT_RULES = {
+    'routes': {'nasi lemak': 'default', '*': []},
+    'min_confidence': 0.5,
+    'uncertain': 'default',
+}
+
+# Every class gets the default route, as before the cascade existed
+DISABLED_RULES = {
+    'routes': {'*': 'default'},
+    'min_confidence': 0.0,
+    'uncertain': 'default',
+}
+
+
+def default_route(side_dish_source):
+    """
+    The route used without rules: side_dish_source, then the local
+    classifier as its fallback
+    """
+    if side_dish_source == 'local':
+        return ('local',)
+    return (side_dish_source, 'local')
+
+
+def load_rules(path):
+    if not path:
+        return DEFAULT_RULES
+    with open(path) as f:
+        return json.load(f)
+
+
+class Cascade:
+    """
+    Routes each main dish prediction to the side dish stages it needs.
+    With speculate, the default route's first stage is started before the
+    main model answers, so it overlaps with inference; its result is thrown
+    away when the route doesn't use it.
+    """
+
+    def __init__(self, rules, side_dish_source, speculate=False):
+        if side_dish_source not in STAGES:
+            raise ValueError(f"Unknown side dish source '{side_dish_source}', expected one of {STAGES}")
+        self.default = default_route(side_dish_source)
+        self.routes = {
+            class_name.lower(): self._parse_route(route)
+            for class_name, route in rules.get('routes', {}).items()
+        }
+        self.fallback = self.routes.pop('*', self.default)
+        self.min_confidence = float(rules.get('min_confidence', 0.0))
+        self.uncertain = self._parse_route(rules.get('uncertain', 'default'))
+        self.speculate = speculate
+
+    def _parse_route(self, route):
+        if route == 'default':
+            return self.default
+        if isinstance(route, str):
+            route = [route]
+        unknown = [stage for stage in route if stage not in STAGES]
+        if unknown:
+            raise ValueError(f"Unknown cascade stages {unknown}, expected some of {STAGES}")
+        return tuple(route)
+
+    def route(self, class_name, confidence):
+        """
+        Stages to try, in order, for a prediction of class_name with
+        confidence between 0 and 1
+        """
+        if confidence < self.min_confidence:
+            return self.uncertain
+        return self.routes.get(class_name.lower(), self.fallback)
+
+    @property
+    def speculative_stage(self):
+        """
+        The stage started before the main model when speculating (the local
+        classifier is cheap enough to never need it), or None
+        """
+        if self.speculate and self.default[0] != 'local':
+            return self.default[0]
+        return None
+
+    def stages(self):
+        """
+        Every stage some route can run
+        """
+        routes = [self.default, self.fallback, self.uncertain, *self.routes.values()]
+        return {stage for route in routes for stage in route}
+
+    def version(self):
+        """
+        The rules as a string, for the prediction cache's model version
+        """
+        return json.dumps({
+            'routes': {**self.routes, '*': self.fallback},
+            'min_confidence': self.min_confidence,
+            'uncertain': self.uncertain,
+        }, sort_keys=True)
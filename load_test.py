@@ -0,0 +1,273 @@
+import argparse
+import glob
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+import sqlite_db
+from fake_roboflow_server import start_fake_roboflow
+
+# End-to-end HTTP load test. Starts server.py (or gunicorn with --gunicorn)
+# against a seeded SQLite stand-in for MySQL and the fake Roboflow API, then
+# drives a weighted mix of /predict, login, history and food info traffic
+# from concurrent simulated users and reports throughput, tail latency and
+# error rates per operation. --url targets an already running server instead.
+#
+#   python load_test.py --mix predict=1,login=3,history=3,food_info=3 --users 32 --duration 60
+
+OPERATIONS = ('predict', 'login', 'history', 'food_info', 'categories', 'summary')
+PASSWORD = "load-test-password"
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}', expected one of {OPERATIONS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args, db_path, roboflow_url, log_path):
+    port = free_port()
+    env = dict(
+        os.environ,
+        FDDC_DB_BACKEND='sqlite',
+        FDDC_SQLITE_PATH=db_path,
+        FDDC_ROBOFLOW_API_URL=roboflow_url,
+        FDDC_LOG_LEVEL='WARNING',
+        FDDC_SAVE_UPLOADS='0',
+        FDDC_PORT=str(port),
+        FDDC_BIND=f"127.0.0.1:{port}",
+    )
+    if args.gunicorn:
+        command = ["gunicorn", "-c", "gunicorn.conf.py"]
+    else:
+        command = [sys.executable, "server.py"]
+    with open(log_path, 'w') as log_file:
+        proc = subprocess.Popen(command, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def wait_until_ready(base_url, timeout, require_models):
+    path = "/health/ready" if require_models else "/health/live"
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(base_url + path, timeout=2).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def create_users(base_url, count):
+    """
+    Register the simulated users; returns their (id, username) pairs
+    """
+    session = requests.Session()
+    prefix = f"loadtest{int(time.time())}"
+    user_ids = []
+    for i in range(count):
+        response = session.post(base_url + "/api/register", json={
+            'username': f"{prefix}_{i}",
+            'email': f"{prefix}_{i}@example.com",
+            'password': PASSWORD,
+            'fullName': f"Load Test {i}",
+        }, timeout=10)
+        response.raise_for_status()
+        user_ids.append((response.json()['id'], f"{prefix}_{i}"))
+    return user_ids
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {op: [] for op in OPERATIONS}
+        self.errors = {op: {} for op in OPERATIONS}
+        self._lock = threading.Lock()
+
+    def record(self, op, seconds, error=None):
+        with self._lock:
+            self.latencies[op].append(seconds)
+            if error is not None:
+                self.errors[op][error] = self.errors[op].get(error, 0) + 1
+
+
+def simulated_user(base_url, user_id, username, images, mix, stop_at, recorder, think_ms):
+    session = requests.Session()
+    ops, weights = zip(*mix.items())
+    category_ids = range(1, len(sqlite_db.SEED_CATEGORIES) + 1)
+    while time.perf_counter() < stop_at:
+        op = random.choices(ops, weights)[0]
+        start = time.perf_counter()
+        error = None
+        try:
+            if op == 'predict':
+                name, img_bytes = random.choice(images)
+                response = session.post(base_url + "/predict", data={'user_id': user_id},
+                                        files={'file': (name, img_bytes, 'image/jpeg')}, timeout=60)
+            elif op == 'login':
+                response = session.post(base_url + "/api/login",
+                                        json={'username': username, 'password': PASSWORD}, timeout=10)
+            elif op == 'history':
+                response = session.get(f"{base_url}/api/predictions/history/{user_id}", timeout=10)
+            elif op == 'food_info':
+                response = session.get(f"{base_url}/api/food-info/{random.choice(category_ids)}", timeout=10)
+            elif op == 'categories':
+                response = session.get(base_url + "/api/food-categories", timeout=10)
+            else:
+                response = session.get(f"{base_url}/api/users/{user_id}/summary", timeout=10)
+            if response.status_code >= 400:
+                error = f"HTTP {response.status_code}"
+        except requests.Timeout:
+            error = "timeout"
+        except requests.RequestException as e:
+            error = type(e).__name__
+        recorder.record(op, time.perf_counter() - start, error)
+        if think_ms:
+            time.sleep(random.expovariate(1000.0 / think_ms))
+
+
+def run(base_url, users, images, mix, duration, think_ms):
+    recorder = Recorder()
+    stop_at = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=simulated_user,
+                         args=(base_url, user_id, username, images, mix, stop_at, recorder, think_ms))
+        for user_id, username in users
+    ]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return recorder, time.perf_counter() - wall_start
+
+
+def summarize(recorder, wall):
+    report = {}
+    all_latencies, all_errors = [], 0
+    for op in OPERATIONS:
+        latencies = recorder.latencies[op]
+        if not latencies:
+            continue
+        errors = sum(recorder.errors[op].values())
+        latencies_ms = np.array(latencies) * 1000
+        report[op] = {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / wall, 2),
+            'error_rate': round(errors / len(latencies), 4),
+            'errors': recorder.errors[op],
+            'p50_ms': round(float(np.percentile(latencies_ms, 50)), 2),
+            'p95_ms': round(float(np.percentile(latencies_ms, 95)), 2),
+            'p99_ms': round(float(np.percentile(latencies_ms, 99)), 2),
+            'max_ms': round(float(latencies_ms.max()), 2),
+        }
+        all_latencies.extend(latencies)
+        all_errors += errors
+    if all_latencies:
+        latencies_ms = np.array(all_latencies) * 1000
+        report['total'] = {
+            'requests': len(all_latencies),
+            'rps': round(len(all_latencies) / wall, 2),
+            'error_rate': round(all_errors / len(all_latencies), 4),
+            'p50_ms': round(float(np.percentile(latencies_ms, 50)), 2),
+            'p95_ms': round(float(np.percentile(latencies_ms, 95)), 2),
+            'p99_ms': round(float(np.percentile(latencies_ms, 99)), 2),
+            'max_ms': round(float(latencies_ms.max()), 2),
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\n{'operation':<11} {'requests':>9} {'req/s':>8} {'errors':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for op, stats in report.items():
+        print(f"{op:<11} {stats['requests']:>9} {stats['rps']:>8.1f} {stats['error_rate'] * 100:>6.1f}% "
+              f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['max_ms']:>8.1f}")
+    for op, stats in report.items():
+        if stats.get('errors'):
+            print(f"  {op} errors: {stats['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end HTTP load test with local MySQL and Roboflow stand-ins")
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--gunicorn", action="store_true", help="start the server with gunicorn.conf.py")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("predict=1,login=2,history=3,food_info=3,categories=1"),
+                        help="weighted operations, e.g. predict=1,login=3,history=3,food_info=3")
+    parser.add_argument("--users", type=int, default=16, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of traffic")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between a user's requests")
+    parser.add_argument("--images", default="test_image/*", help="upload images for /predict")
+    parser.add_argument("--roboflow-latency-ms", type=float, default=150.0)
+    parser.add_argument("--roboflow-failure-rate", type=float, default=0.0)
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    parser.add_argument("--output", help="write the report to this JSON file")
+    args = parser.parse_args()
+
+    images = []
+    for path in sorted(glob.glob(args.images)):
+        with open(path, 'rb') as f:
+            images.append((os.path.basename(path), f.read()))
+    if 'predict' in args.mix and not images:
+        raise SystemExit(f"No images found matching {args.images}")
+
+    proc = None
+    roboflow = None
+    try:
+        if args.url:
+            base_url = args.url
+        else:
+            work_dir = tempfile.mkdtemp(prefix="fddc-load-")
+            db_path = os.path.join(work_dir, "fddc.db")
+            log_path = os.path.join(work_dir, "server.log")
+            sqlite_db.init_db(db_path)
+            roboflow, roboflow_url = start_fake_roboflow(
+                latency_ms=args.roboflow_latency_ms, failure_rate=args.roboflow_failure_rate
+            )
+            proc, base_url = start_server(args, db_path, roboflow_url, log_path)
+            print(f"🔄 Starting server at {base_url} (SQLite stand-in {db_path}, fake Roboflow {roboflow_url}, "
+                  f"log {log_path})...")
+
+        if not wait_until_ready(base_url, args.startup_timeout, require_models='predict' in args.mix):
+            raise SystemExit(f"❌ Server did not become ready, see {log_path if proc is not None else args.url}")
+
+        users = create_users(base_url, args.users)
+        print(f"🔄 {args.users} users for {args.duration:.0f}s, mix {args.mix}...")
+        recorder, wall = run(base_url, users, images, args.mix, args.duration, args.think_ms)
+
+        report = summarize(recorder, wall)
+        print_report(report)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'mix': args.mix, 'users': args.users, 'duration_s': round(wall, 2),
+                           'operations': report}, f, indent=2)
+            print(f"\n✅ Report written to {args.output}")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if roboflow is not None:
+            roboflow.shutdown()
+
+
+if __name__ == "__main__":
+    main()
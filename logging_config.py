@@ -0,0 +1,47 @@
+import json
+import logging
+import os
+import sys
+
+# Standard fields of a LogRecord; anything else was passed with extra={...}
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line, with any extra={...} fields as keys
+    """
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging():
+    """
+    Set up logging from FDDC_LOG_LEVEL (DEBUG, INFO, WARNING, ERROR or OFF)
+    and FDDC_LOG_FORMAT (text or json)
+    """
+    level = os.environ.get('FDDC_LOG_LEVEL', 'INFO').upper()
+    root = logging.getLogger()
+    if level == 'OFF':
+        logging.disable(logging.CRITICAL)
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    if os.environ.get('FDDC_LOG_FORMAT', 'text') == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    root.handlers = [handler]
+    root.setLevel(level)
@@ -0,0 +1,134 @@
+import os
+import threading
+
+import numpy as np
+
+# Backends the server can run the classifiers with. The TFLite variants are
+# produced next to each .keras file by `python convert_to_tflite.py --server`.
+BACKENDS = {
+    'keras': '.keras',
+    'tflite': '.tflite',
+    'tflite-fp16': '_fp16.tflite',
+    'tflite-int8': '_int8.tflite',
+}
+
+
+def backend_model_path(keras_path, backend):
+    """
+    Map a .keras model path to the file the given backend loads
+    e.g. food_classification_model.keras -> food_classification_model_int8.tflite
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown model backend '{backend}', expected one of {list(BACKENDS)}")
+    base, _ = os.path.splitext(keras_path)
+    return base + BACKENDS[backend]
+
+
+class KerasBackend:
+    """
+    Runs a full Keras model
+    """
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+        self.model_path = model_path
+        self.model = tf.keras.models.load_model(model_path)
+
+    def predict(self, batch):
+        return self.model.predict_on_batch(batch)
+
+
+class TFLiteBackend:
+    """
+    Runs a converted .tflite model (float32, float16 or int8 quantized)
+    with the TFLite interpreter
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+
+        self.model_path = model_path
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._batch_size = int(self._input['shape'][0])
+        self.input_shape = list(self._input['shape'])
+        # The interpreter is not thread-safe; requests share it one at a time
+        self._lock = threading.Lock()
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            if len(batch) != self._batch_size:
+                self.interpreter.resize_tensor_input(self._input['index'], batch.shape)
+                self.interpreter.allocate_tensors()
+                self._input = self.interpreter.get_input_details()[0]
+                self._batch_size = len(batch)
+
+            self.interpreter.set_tensor(self._input['index'], _quantize(batch, self._input))
+            self.interpreter.invoke()
+
+            outputs = [
+                _dequantize(self.interpreter.get_tensor(detail['index']), detail)
+                for detail in self.interpreter.get_output_details()
+            ]
+        return outputs[0] if len(outputs) == 1 else outputs
+
+
+class OnnxBackend:
+    """
+    Runs an .onnx model with ONNX Runtime on the CPU (used for the side
+    dish detector; the classifiers are served as Keras or TFLite)
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        try:
+            import onnxruntime
+        except ImportError:
+            raise ImportError("ONNX models need onnxruntime: pip install onnxruntime")
+
+        self.model_path = model_path
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input = self.session.get_inputs()[0]
+        self.input_shape = self._input.shape
+
+    def predict(self, batch):
+        # InferenceSession.run is thread-safe
+        outputs = self.session.run(None, {self._input.name: np.asarray(batch, dtype=np.float32)})
+        return outputs[0] if len(outputs) == 1 else outputs
+
+
+def _quantize(array, detail):
+    if detail['dtype'] in (np.int8, np.uint8):
+        scale, zero_point = detail['quantization']
+        info = np.iinfo(detail['dtype'])
+        array = np.clip(np.round(array / scale + zero_point), info.min, info.max)
+    return array.astype(detail['dtype'])
+
+
+def _dequantize(array, detail):
+    if detail['dtype'] in (np.int8, np.uint8):
+        scale, zero_point = detail['quantization']
+        return (array.astype(np.float32) - zero_point) * scale
+    return array
+
+
+def load_backend(backend, keras_path):
+    """
+    Load the model stored at keras_path (or its converted variant) with the
+    given backend
+    """
+    model_path = backend_model_path(keras_path, backend)
+    if backend == 'keras':
+        return KerasBackend(model_path)
+    num_threads = os.environ.get('FDDC_TFLITE_THREADS')
+    return TFLiteBackend(model_path, num_threads=int(num_threads) if num_threads else None)
@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+
+class ModelUnavailableError(Exception):
+    pass
+
+
+class ModelRegistry:
+    """
+    Loads the server's models once, either in the background or lazily on
+    first use, then runs a warm-up pass over them. Callers get the loaded
+    models from get(), which waits for an in-progress load and raises
+    ModelUnavailableError if loading failed or takes too long.
+
+    load_fn() returns the models (any object, e.g. a dict); warm_up_fn(models)
+    runs once after a successful load.
+    """
+
+    def __init__(self, load_fn, warm_up_fn=None):
+        self.load_fn = load_fn
+        self.warm_up_fn = warm_up_fn
+        self._models = None
+        self._error = None
+        self._state = 'not_loaded'
+        self._timings = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._pid = None
+
+    def start(self, background=True):
+        """
+        Begin loading, on a background thread or (background=False) right
+        here. Does nothing if this process already started loading.
+        """
+        if not self._claim():
+            return
+        if background:
+            threading.Thread(target=self._load, name="model-loader", daemon=True).start()
+        else:
+            self._load()
+
+    def get(self, timeout=None):
+        """
+        The loaded models. Loads them on the calling thread if nothing has
+        started loading yet, otherwise waits up to timeout seconds.
+        """
+        if self._done.is_set() and self._pid == os.getpid():
+            return self._result()
+        if self._claim():
+            self._load()
+        elif not self._done.wait(timeout):
+            raise ModelUnavailableError(f"Models are still {self._state}")
+        return self._result()
+
+    @property
+    def ready(self):
+        return self._state == 'ready' and self._pid == os.getpid()
+
+    def status(self):
+        return {
+            'state': self._state,
+            'error': self._error,
+            **self._timings
+        }
+
+    def _claim(self):
+        # Whoever moves not_loaded -> loading does the load. A forked child
+        # starts over, since the parent's loader thread didn't come along.
+        with self._lock:
+            if self._pid == os.getpid() and self._state != 'not_loaded':
+                return False
+            self._pid = os.getpid()
+            self._state = 'loading'
+            self._models = None
+            self._error = None
+            self._timings = {}
+            self._done = threading.Event()
+            return True
+
+    def _load(self):
+        try:
+            start = time.perf_counter()
+            models = self.load_fn()
+            self._timings['load_seconds'] = round(time.perf_counter() - start, 3)
+
+            if self.warm_up_fn is not None:
+                self._state = 'warming'
+                start = time.perf_counter()
+                self.warm_up_fn(models)
+                self._timings['warm_up_seconds'] = round(time.perf_counter() - start, 3)
+
+            self._models = models
+            self._state = 'ready'
+        except Exception as e:
+            self._error = f"{type(e).__name__}: {e}"
+            self._state = 'failed'
+            log.error("Error loading models: %s", self._error)
+        finally:
+            self._done.set()
+
+    def _result(self):
+        if self._state != 'ready':
+            raise ModelUnavailableError(f"Models failed to load ({self._error})")
+        return self._models
@@ -0,0 +1,79 @@
+import numpy as np
+
+# Portion-aware nutrition for detected side dishes. Each ingredient has the
+# nutrition of a standard nasi lemak portion and the share of a typical
+# phone photo of the plate that such a portion covers. A detection's box
+# area relative to the photo, divided by that reference share, scales the
+# standard portion. Everything lives in NumPy arrays built at import, so an
+# image's estimate is a handful of vectorised operations.
+
+NUTRIENTS = ('calories', 'protein', 'carbs', 'fats')
+
+# name: (calories, protein g, carbs g, fats g per standard portion,
+#        fraction of the photo a standard portion covers)
+INGREDIENTS = {
+    'Anchovies': (60, 7.0, 0.0, 3.5, 0.03),        # ~15 g fried ikan bilis
+    'Boiled-Egg': (78, 6.3, 0.6, 5.3, 0.04),       # half to one egg
+    'Fried-Egg': (90, 6.3, 0.4, 7.0, 0.06),
+    'Sambal': (70, 1.0, 6.0, 5.0, 0.03),           # ~30 g
+    'Cucumber': (5, 0.2, 1.1, 0.0, 0.03),          # a few slices
+    'Peanuts': (90, 4.0, 2.5, 7.5, 0.02),          # ~15 g fried
+    'Rice': (300, 5.0, 50.0, 9.0, 0.20),           # ~150 g coconut rice
+    'Fried-Chicken': (260, 20.0, 8.0, 16.0, 0.10),
+    'Chicken Rendang': (220, 19.0, 5.0, 14.0, 0.08),
+}
+
+# Names the local side dish classifier (and older data) uses for the same things
+ALIASES = {
+    'Ikan Bilis': 'Anchovies',
+    'Telur': 'Boiled-Egg',
+    'Timun': 'Cucumber',
+    'Kacang': 'Peanuts',
+}
+
+# A box can be partly hidden or cover more than the food, so keep estimates
+# within a sensible range of the standard portion
+MIN_PORTION = 0.25
+MAX_PORTION = 3.0
+
+_NAMES = list(INGREDIENTS)
+_INDEX = {name.lower(): i for i, name in enumerate(_NAMES)}
+_INDEX.update({alias.lower(): _INDEX[name.lower()] for alias, name in ALIASES.items()})
+_TABLE = np.array([values[:4] for values in INGREDIENTS.values()], dtype=np.float64)
+_REFERENCE_AREA = np.array([values[4] for values in INGREDIENTS.values()], dtype=np.float64)
+
+
+def estimate(detections, image_size):
+    """
+    Per-item nutrition for side dish detections ({'name', 'confidence'} plus
+    the box 'width'/'height' in image pixels when the source provides one)
+    from a photo of image_size (width, height). Items without a box count as
+    one standard portion; unknown names are left out.
+    Returns {'items': [...], 'total': {nutrient: value}}
+    """
+    known = [(d, _INDEX[d['name'].lower()]) for d in detections if d['name'].lower() in _INDEX]
+    if not known:
+        return {'items': [], 'total': {nutrient: 0.0 for nutrient in NUTRIENTS}}
+
+    indices = np.array([index for _, index in known])
+    box_areas = np.array([d['width'] * d['height'] if 'width' in d else np.nan
+                          for d, _ in known], dtype=np.float64)
+    area_fractions = box_areas / float(image_size[0] * image_size[1])
+    portions = np.where(
+        np.isnan(area_fractions),
+        1.0,
+        np.clip(area_fractions / _REFERENCE_AREA[indices], MIN_PORTION, MAX_PORTION)
+    )
+    values = _TABLE[indices] * portions[:, np.newaxis]
+
+    items = []
+    for (detection, _), portion, area_fraction, row in zip(known, portions, area_fractions, values.round(1)):
+        item = {
+            'name': detection['name'],
+            'portion': round(float(portion), 2),
+            'area_fraction': None if np.isnan(area_fraction) else round(float(area_fraction), 4),
+        }
+        item.update(zip(NUTRIENTS, row.tolist()))
+        items.append(item)
+    total = dict(zip(NUTRIENTS, values.sum(axis=0).round(1).tolist()))
+    return {'items': items, 'total': total}
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+
+def model_version(*parts):
+    """
+    Fingerprint of the models and settings predictions come from. Model
+    files are identified by path, size and modification time, so retraining
+    or swapping a model changes the version and retires old cache entries.
+    """
+    fingerprint = []
+    for part in parts:
+        if hasattr(part, 'model_path'):
+            stat = os.stat(part.model_path)
+            part = f"{part.model_path}:{stat.st_size}:{stat.st_mtime_ns}"
+        fingerprint.append(str(part))
+    return hashlib.sha256("|".join(fingerprint).encode()).hexdigest()[:16]
+
+
+class PredictionCache:
+    """
+    Prediction results keyed on a hash of the image bytes plus the model
+    version. Recent entries live in an in-memory LRU; with disk_dir set,
+    every entry is also written there as JSON and survives restarts.
+    """
+
+    def __init__(self, max_entries=1024, disk_dir=None, model_version=""):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.model_version = model_version
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def key(self, namespace, img_bytes):
+        digest = hashlib.sha256()
+        digest.update(f"{self.model_version}|{namespace}|".encode())
+        digest.update(img_bytes)
+        return digest.hexdigest()
+
+    def get(self, key):
+        if self.max_entries <= 0:
+            return None
+
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._remember(key, value)
+        self._write_disk(key, value)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'disk': self.disk_dir is not None,
+                'model_version': self.model_version,
+            }
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key):
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, value):
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log.warning("Could not write prediction cache entry: %s", e)
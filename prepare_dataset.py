@@ -0,0 +1,298 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Dataset preparation: resizes every image under the source tree (at any
+# depth, e.g. dataset/train/<class>/) across a process pool and writes the
+# results to a separate directory, leaving the originals untouched. A
+# manifest of content hashes lets later runs skip unchanged images, near
+# duplicate downloads are dropped using a perceptual hash, and the output can
+# also be written as sharded TFRecord files.
+#
+#   python prepare_dataset.py dataset dataset_prepared --tfrecord-shards 4
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif")
+MANIFEST_NAME = "manifest.json"
+TFRECORD_DIR = "tfrecords"
+
+
+def list_sources(src):
+    """
+    Image paths under src, relative to it, in a stable order
+    """
+    sources = []
+    for root, dirs, files in os.walk(src):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                sources.append(os.path.relpath(os.path.join(root, name), src))
+    return sources
+
+
+def output_name(rel_path):
+    """
+    Output path of a source: JPEGs keep their name, other formats get a .jpg
+    suffix appended so e.g. dish.png and dish.jpg can't collide
+    """
+    if rel_path.lower().endswith((".jpg", ".jpeg")):
+        return rel_path
+    return rel_path + ".jpg"
+
+
+def difference_hash(img, hash_size=8):
+    """
+    64-bit perceptual hash: whether each pixel of a small grayscale copy is
+    brighter than its right neighbour. Re-encoded, resized or slightly
+    recompressed copies of a photo land within a few bits of each other.
+    """
+    small = np.asarray(img.convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int("".join('1' if bit else '0' for bit in bits), 2)
+
+
+def process_image(task):
+    """
+    Resize one source image and save it as JPEG (runs in a worker process)
+    Returns its manifest record
+    """
+    rel_path, src, dst, size, quality, sha1 = task
+    record = {'sha1': sha1, 'output': output_name(rel_path)}
+    try:
+        with Image.open(os.path.join(src, rel_path)) as img:
+            img = ImageOps.exif_transpose(img).convert('RGB')
+            record['dhash'] = f"{difference_hash(img):016x}"
+            img = img.resize((size, size), Image.BICUBIC)
+            out_path = os.path.join(dst, record['output'])
+            os.makedirs(os.path.dirname(out_path), exist_ok=True)
+            img.save(out_path, "JPEG", quality=quality)
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    return rel_path, record
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_duplicates(rel_paths, dhashes, max_distance):
+    """
+    Map each near-duplicate to the first image (in rel_paths order) it
+    matches within max_distance differing hash bits
+    """
+    if not rel_paths:
+        return {}
+    hashes = np.array([int(h, 16) for h in dhashes], dtype=np.uint64)
+    duplicates = {}
+    kept = np.ones(len(hashes), dtype=bool)
+    for i in range(len(hashes)):
+        if not kept[i]:
+            continue
+        later = np.arange(i + 1, len(hashes))
+        later = later[kept[later]]
+        if not len(later):
+            break
+        xor = np.bitwise_xor(hashes[later], hashes[i])
+        distances = np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        for j in later[distances <= max_distance]:
+            kept[j] = False
+            duplicates[rel_paths[j]] = rel_paths[i]
+    return duplicates
+
+
+def load_manifest(dst, settings):
+    try:
+        with open(os.path.join(dst, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # Different output settings invalidate every entry
+    return manifest['images'] if manifest.get('settings') == settings else {}
+
+
+def remove_output(dst, record):
+    try:
+        os.remove(os.path.join(dst, record['output']))
+    except OSError:
+        pass
+
+
+def write_tfrecords(dst, images, shards):
+    """
+    Write the kept images as <dst>/tfrecords/<split>-NNNNN-of-NNNNN.tfrecord,
+    where split is the first directory level (train, validation) and the
+    class is the next one. Labels follow the sorted class names, as in
+    flow_from_directory and training_data.
+    """
+    import tensorflow as tf
+
+    def bytes_feature(value):
+        return tf.train.Feature(bytes_list=tf.train.BytesList(value=[value]))
+
+    def int_feature(value):
+        return tf.train.Feature(int64_list=tf.train.Int64List(value=[value]))
+
+    splits = {}
+    for rel_path, record in images.items():
+        parts = rel_path.replace("\\", "/").split("/")
+        if len(parts) < 3:
+            continue
+        splits.setdefault(parts[0], []).append((parts[1], rel_path, record))
+
+    out_dir = os.path.join(dst, TFRECORD_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    for name in os.listdir(out_dir):
+        os.remove(os.path.join(out_dir, name))
+
+    counts = {}
+    for split, entries in sorted(splits.items()):
+        class_names = sorted({class_name for class_name, _, _ in entries})
+        writers = [
+            tf.io.TFRecordWriter(os.path.join(out_dir, f"{split}-{shard:05d}-of-{shards:05d}.tfrecord"))
+            for shard in range(shards)
+        ]
+        for i, (class_name, rel_path, record) in enumerate(sorted(entries)):
+            with open(os.path.join(dst, record['output']), 'rb') as f:
+                encoded = f.read()
+            example = tf.train.Example(features=tf.train.Features(feature={
+                'image/encoded': bytes_feature(encoded),
+                'image/class/label': int_feature(class_names.index(class_name)),
+                'image/class/text': bytes_feature(class_name.encode()),
+                'image/source': bytes_feature(rel_path.encode()),
+                'image/sha1': bytes_feature(record['sha1'].encode()),
+            }))
+            writers[i % shards].write(example.SerializeToString())
+        for writer in writers:
+            writer.close()
+        counts[split] = len(entries)
+    return counts
+
+
+def _run(tasks, workers):
+    """
+    Process tasks on a pool; returns (records, errors) keyed by source path
+    """
+    records, errors = {}, {}
+    if not tasks:
+        return records, errors
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rel_path, record in pool.map(process_image, tasks, chunksize=8):
+            if 'error' in record:
+                errors[rel_path] = record['error']
+            else:
+                records[rel_path] = record
+    return records, errors
+
+
+def prepare(src, dst, size=224, quality=95, workers=None, dedupe_distance=4, tfrecord_shards=0):
+    """
+    Bring dst up to date with src. Returns a summary dict of what was done.
+    """
+    settings = {'size': size, 'quality': quality}
+    previous = load_manifest(dst, settings)
+    sources = list_sources(src)
+    os.makedirs(dst, exist_ok=True)
+
+    # Hashing is I/O-bound and cheap next to decoding, so it stays here.
+    # Unchanged images keep their record; earlier duplicates have no output
+    # file but keep their perceptual hash so they aren't decoded again.
+    hashes = {rel_path: file_hash(os.path.join(src, rel_path)) for rel_path in sources}
+    images, tasks = {}, []
+    for rel_path in sources:
+        record = previous.get(rel_path)
+        if record and record['sha1'] == hashes[rel_path] and 'error' not in record \
+                and ('duplicate_of' in record or os.path.exists(os.path.join(dst, record['output']))):
+            images[rel_path] = {key: record[key] for key in ('sha1', 'output', 'dhash')}
+        else:
+            tasks.append((rel_path, src, dst, size, quality, hashes[rel_path]))
+
+    # Outputs of sources that were deleted
+    for rel_path, record in previous.items():
+        if rel_path not in hashes and 'output' in record:
+            remove_output(dst, record)
+
+    processed, errors = _run(tasks, workers)
+    images.update(processed)
+
+    duplicates = {}
+    if dedupe_distance >= 0:
+        ordered = [rel_path for rel_path in sources if rel_path in images]
+        duplicates = find_duplicates(ordered, [images[p]['dhash'] for p in ordered], dedupe_distance)
+        for rel_path in duplicates:
+            remove_output(dst, images[rel_path])
+
+    # An earlier duplicate whose original has since gone needs its output back
+    restore = [
+        (rel_path, src, dst, size, quality, hashes[rel_path])
+        for rel_path, record in images.items()
+        if rel_path not in duplicates and not os.path.exists(os.path.join(dst, record['output']))
+    ]
+    restored, restore_errors = _run(restore, workers)
+    images.update(restored)
+    errors.update(restore_errors)
+    for rel_path in restore_errors:
+        images.pop(rel_path, None)
+
+    manifest_images = {}
+    for rel_path, record in images.items():
+        manifest_images[rel_path] = dict(record, duplicate_of=duplicates[rel_path]) \
+            if rel_path in duplicates else record
+    for rel_path, error in errors.items():
+        manifest_images[rel_path] = {'sha1': hashes[rel_path], 'output': output_name(rel_path), 'error': error}
+    with open(os.path.join(dst, MANIFEST_NAME), 'w') as f:
+        json.dump({'settings': settings, 'images': dict(sorted(manifest_images.items()))}, f, indent=1)
+
+    summary = {
+        'sources': len(sources),
+        'processed': len(processed) + len(restored),
+        'skipped': len(sources) - len(tasks),
+        'duplicates': duplicates,
+        'errors': errors,
+    }
+    if tfrecord_shards:
+        kept = {rel_path: record for rel_path, record in images.items() if rel_path not in duplicates}
+        summary['tfrecords'] = write_tfrecords(dst, kept, tfrecord_shards)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resize, dedupe and shard an image dataset")
+    parser.add_argument("src", nargs="?", default="dataset")
+    parser.add_argument("dst", nargs="?", default="dataset_prepared")
+    parser.add_argument("--size", type=int, default=224, help="output width and height")
+    parser.add_argument("--quality", type=int, default=95, help="output JPEG quality")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--dedupe-distance", type=int, default=4,
+                        help="max differing perceptual hash bits for a near duplicate, -1 to keep all")
+    parser.add_argument("--tfrecord-shards", type=int, default=0,
+                        help="also write this many TFRecord shards per split (needs TensorFlow)")
+    args = parser.parse_args()
+
+    if os.path.abspath(args.src) == os.path.abspath(args.dst):
+        raise SystemExit("❌ The output directory must differ from the source")
+
+    start = time.perf_counter()
+    summary = prepare(args.src, args.dst, args.size, args.quality, args.workers,
+                      args.dedupe_distance, args.tfrecord_shards)
+    for rel_path, original in summary['duplicates'].items():
+        print(f"♻️ {rel_path} duplicates {original}")
+    for rel_path, error in summary['errors'].items():
+        print(f"⚠️ {rel_path}: {error}")
+    print(f"✅ {summary['sources']} images: {summary['processed']} processed, {summary['skipped']} unchanged, "
+          f"{len(summary['duplicates'])} duplicates dropped, {len(summary['errors'])} failed "
+          f"({time.perf_counter() - start:.1f}s) -> {args.dst}")
+    if 'tfrecords' in summary:
+        print(f"✅ TFRecords: {summary['tfrecords']} in {os.path.join(args.dst, TFRECORD_DIR)}")
+
+
+if __name__ == "__main__":
+    main()
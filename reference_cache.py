@@ -0,0 +1,120 @@
+import hashlib
+import json
+import threading
+import time
+
+import db_pool
+
+
+def load_reference_data():
+    """
+    Read the food categories, their nutrition info and the ingredient names
+    in one go
+    """
+    with db_pool.db_session() as conn:
+        cursor = conn.cursor(dictionary=True)
+
+        cursor.execute("SELECT * FROM food_categories")
+        categories = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT
+                fc.id,
+                fc.name,
+                fc.description,
+                fi.calories,
+                fi.protein,
+                fi.carbs,
+                fi.fats,
+                fi.description as nutritional_info,
+                fi.cultural_info
+            FROM food_categories fc
+            LEFT JOIN food_info fi ON fc.id = fi.food_category_id
+        """)
+        food_info = cursor.fetchall()
+
+        cursor.execute("SELECT food_category_id, calories, protein, carbs, fats FROM food_info")
+        nutrition = cursor.fetchall()
+
+        cursor.execute("SELECT id, name FROM ingredients")
+        ingredients = cursor.fetchall()
+        cursor.close()
+
+    # Convert datetime objects to strings for JSON serialization
+    for category in categories:
+        if category.get('created_at'):
+            category['created_at'] = category['created_at'].isoformat()
+
+    # A category with several food_info rows is described by the first one, as a
+    # LIMIT-less fetchone() used to
+    food_info_by_id, nutrition_by_category = {}, {}
+    for info in food_info:
+        food_info_by_id.setdefault(info['id'], info)
+    for row in nutrition:
+        nutrition_by_category.setdefault(row.pop('food_category_id'), row)
+
+    return {
+        'categories': categories,
+        'categories_by_id': {category['id']: category for category in categories},
+        # MySQL compares names case-insensitively, so the lookups do too
+        'categories_by_name': {category['name'].lower(): category for category in categories},
+        'food_info_by_id': food_info_by_id,
+        'nutrition_by_category': nutrition_by_category,
+        'ingredients_by_name': {ingredient['name'].lower(): ingredient['id'] for ingredient in ingredients},
+        'etag': hashlib.sha1(
+            json.dumps([categories, food_info, ingredients], sort_keys=True, default=str).encode()
+        ).hexdigest(),
+    }
+
+
+class ReferenceDataCache:
+    """
+    Read-through cache for reference data that almost never changes (the
+    food categories seeded by scripts like add_nasi_ayam.sql). Reloads after
+    ttl seconds or when invalidated; concurrent misses share one reload.
+    """
+
+    def __init__(self, load_fn=load_reference_data, ttl=300.0):
+        self.load_fn = load_fn
+        self.ttl = ttl
+        self._data = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        data = self._data
+        if data is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return data
+        with self._lock:
+            if self._data is None or time.monotonic() - self._loaded_at >= self.ttl:
+                self._data = self.load_fn()
+                self._loaded_at = time.monotonic()
+            return self._data
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
+
+    def etag(self):
+        return self.get()['etag']
+
+    def categories(self):
+        return self.get()['categories']
+
+    def category(self, category_id):
+        return self.get()['categories_by_id'].get(category_id)
+
+    def category_by_name(self, name):
+        return self.get()['categories_by_name'].get(name.lower())
+
+    def food_info(self, category_id):
+        return self.get()['food_info_by_id'].get(category_id)
+
+    def nutrition(self, category_id):
+        """
+        Calories, protein, carbs and fats of a category, or None if it has no food_info row
+        """
+        return self.get()['nutrition_by_category'].get(category_id)
+
+    def ingredient_id(self, name):
+        return self.get()['ingredients_by_name'].get(name.lower())
@@ -0,0 +1,167 @@
+import base64
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RoboflowError(Exception):
+    """
+    Roboflow couldn't be used for this request; callers should fall back
+    to local side dish detection
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing service for reset_timeout seconds after
+    failure_threshold consecutive failures, then lets a single trial request
+    through to decide whether to close again
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half-open'
+                self._trial_in_flight = False
+            if self.state == 'half-open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == 'half-open' or self._failures >= self.failure_threshold:
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class RoboflowClient:
+    """
+    Side dish detection through the Roboflow hosted API, over a pooled
+    keep-alive session with timeouts, bounded retries with exponential
+    backoff and a circuit breaker
+    """
+
+    # Worth retrying: rate limiting and server-side errors
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, api_url, api_key, model_id, version, timeout=(3.05, 10.0),
+                 max_retries=2, backoff=0.25, pool_size=10, breaker=None):
+        self.url = f"{api_url.rstrip('/')}/{model_id}/{version}"
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        # Attempts by outcome, for the server's metrics
+        self.outcomes = {}
+        self._outcomes_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def detect(self, image_bytes):
+        """
+        Return [{'name', 'confidence', 'x', 'y', 'width', 'height'}] sorted
+        by confidence (in percent), boxes as centre and size in pixels of
+        the uploaded image, or raise RoboflowError
+        """
+        if not self.breaker.allow():
+            self._count('circuit_open')
+            raise RoboflowError("circuit breaker open")
+
+        image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                response = self.session.post(
+                    self.url,
+                    params={'api_key': self.api_key},
+                    data=image_base64,
+                    headers={"Content-Type": "application/x-www-form-urlencoded"},
+                    timeout=self.timeout
+                )
+            except requests.Timeout as e:
+                self._count('timeout')
+                last_error = f"timed out: {e}"
+                continue
+            except requests.ConnectionError as e:
+                self._count('connection_error')
+                last_error = f"connection failed: {e}"
+                continue
+            except requests.RequestException as e:
+                self._count('request_error')
+                self.breaker.record_failure()
+                raise RoboflowError(f"request failed: {e}")
+
+            if response.status_code != 200:
+                self._count(f'http_{response.status_code}')
+            if response.status_code in self.RETRY_STATUSES:
+                last_error = f"status {response.status_code}"
+                continue
+            if response.status_code != 200:
+                # e.g. 403 Forbidden for a bad API key; retrying won't help
+                self.breaker.record_failure()
+                raise RoboflowError(f"status {response.status_code}: {response.text[:200]}")
+
+            try:
+                detections = parse_predictions(response.json())
+            except ValueError as e:
+                self._count('invalid_response')
+                self.breaker.record_failure()
+                raise RoboflowError(f"invalid response: {e}")
+            self._count('success')
+            self.breaker.record_success()
+            return detections
+
+        self.breaker.record_failure()
+        raise RoboflowError(f"{last_error} after {self.max_retries + 1} attempts")
+
+    def outcome_counts(self):
+        with self._outcomes_lock:
+            return dict(self.outcomes)
+
+    def _count(self, outcome):
+        with self._outcomes_lock:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+
+def parse_predictions(response_json):
+    if not isinstance(response_json, dict):
+        raise ValueError(f"expected a JSON object, got {type(response_json).__name__}")
+    detections = []
+    for pred in response_json.get("predictions", []):
+        detection = {
+            'name': pred.get("class", "Unknown"),
+            'confidence': round(pred.get("confidence", 0) * 100, 2)  # Convert to percentage
+        }
+        # Keep the box for portion estimation
+        if all(key in pred for key in ('x', 'y', 'width', 'height')):
+            detection.update({key: float(pred[key]) for key in ('x', 'y', 'width', 'height')})
+        detections.append(detection)
+    return sorted(detections, key=lambda x: x['confidence'], reverse=True)
@@ -1,224 +1,733 @@
-from flask import Flask, request, jsonify, send_from_directory
-import tensorflow as tf
+from flask import Flask, Response, request, jsonify, send_from_directory, g
 import numpy as np
-from tensorflow.keras.preprocessing import image
-from PIL import Image
-import io
 import base64
-import mysql.connector
 import hashlib
 import os
 from flask_cors import CORS
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+import logging
+from inference_batcher import InferenceBatcher
+from model_backends import load_backend
+from model_registry import ModelRegistry, ModelUnavailableError
+import db_pool
+from reference_cache import ReferenceDataCache
+from roboflow_client import CircuitBreaker, RoboflowClient, RoboflowError
+from side_dish_detector import DetectorError, SideDishDetector, load_class_names
+from concurrent.futures import ThreadPoolExecutor
+from async_jobs import JobQueue, QueueFullError
+from image_pipeline import IMG_SIZE, ImageProcessingError, decode_base64_image, image_size, preprocess_image, save_image_async
+from prediction_cache import PredictionCache, model_version
+import daily_summary
+import inference_cascade
+import metrics
+import portion_estimator
+import side_dishes
+import tta
+from logging_config import configure_logging
 
 app = Flask(__name__)
-CORS(app)
+CORS(app, expose_headers=['X-Next-Cursor'])
+
+# FDDC_LOG_LEVEL=DEBUG logs every prediction, OFF silences the server
+configure_logging()
+log = logging.getLogger('server')
+
+# Served at /metrics (see the collected metrics registered further down)
+REQUEST_SECONDS = metrics.REGISTRY.histogram(
+    'fddc_http_request_duration_seconds', 'Time to answer an HTTP request', ['endpoint', 'method']
+)
+REQUESTS = metrics.REGISTRY.counter(
+    'fddc_http_requests_total', 'HTTP requests answered', ['endpoint', 'method', 'status']
+)
+STAGE_SECONDS = metrics.REGISTRY.histogram(
+    'fddc_predict_stage_seconds', 'Time spent in each stage of the prediction pipeline', ['stage']
+)
+PREDICTIONS = metrics.REGISTRY.counter(
+    'fddc_predictions_total', 'Main dish predictions by class and where the answer came from',
+    ['class_name', 'source']
+)
+SIDE_DISH_FALLBACKS = metrics.REGISTRY.counter(
+    'fddc_side_dish_fallbacks_total', 'Predictions that fell back to the local side dish model'
+)
+CASCADE_STAGES = metrics.REGISTRY.counter(
+    'fddc_cascade_stages_total',
+    'Side dish stages by outcome: run, skipped by the cascade, or wasted (started speculatively, then skipped)',
+    ['stage', 'outcome']
+)
 
 # Configure TensorFlow to be less verbose
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
-print("🔄 Loading TensorFlow models...")
+# Which runtime serves the classifiers: keras, tflite, tflite-fp16 or tflite-int8
+MODEL_BACKEND = os.environ.get('FDDC_MODEL_BACKEND', 'keras')
+
+# Serve both classifiers from one shared MobileNetV2 backbone
+# (export it first with `python export_multihead_model.py`)
+USE_MULTIHEAD_MODEL = os.environ.get('FDDC_MULTIHEAD_MODEL', '0') == '1'
+
+# Where /predict gets side dishes from: roboflow, detector (the exported
+# Roboflow detector run locally, see side_dish_detector.py) or local (the
+# multi-label side dish classifier)
+SIDE_DISH_SOURCE = os.environ.get('FDDC_SIDE_DISH_SOURCE', 'roboflow')
+DETECTOR_MODEL_PATH = os.environ.get('FDDC_DETECTOR_MODEL', 'side_dish_detector.onnx')
+
+# Requests arriving within BATCH_MAX_WAIT_MS of each other share one
+# main_model call (up to BATCH_MAX_SIZE images). A size of 1 disables batching.
+BATCH_MAX_SIZE = int(os.environ.get('FDDC_BATCH_MAX_SIZE', '8'))
+BATCH_MAX_WAIT_MS = float(os.environ.get('FDDC_BATCH_MAX_WAIT_MS', '5'))
+
+# How the models get loaded: background (routes that don't need them answer
+# while TensorFlow loads), lazy (on the first request that needs them) or eager
+MODEL_LOADING = os.environ.get('FDDC_MODEL_LOADING', 'background')
+
+# Batch sizes pushed through the models once after loading, so the first real
+# requests don't pay for graph tracing and buffer allocation ('' skips warm-up)
+WARMUP_BATCH_SIZES = sorted({
+    int(size) for size in os.environ.get('FDDC_WARMUP_BATCH_SIZES', f'1,{BATCH_MAX_SIZE}').split(',')
+    if size.strip()
+})
+
+# Test-time augmentation: average the main model over this many flipped and
+# cropped views of each upload, run as one batch (1 turns it off). /predict
+# and /predict/batch take ?tta=<views> to override it per request.
+TTA_VIEWS = int(os.environ.get('FDDC_TTA_VIEWS', '1'))
+
+# Seconds a request waits for models that are still loading before a 503
+MODEL_WAIT_TIMEOUT = float(os.environ.get('FDDC_MODEL_WAIT_TIMEOUT', '30'))
+
+MODEL_VERSION = None
+
+# Per-label thresholds for the multi-label side dish model, read with the
+# models (side_dishes.DEFAULT_THRESHOLD for labels without one)
+SIDE_DISH_THRESHOLDS = {}
+
+def load_models():
+    """
+    Load both classifiers with MODEL_BACKEND
+    Returns {'main': model, 'side': model, or None with the multi-head model}
+    """
+    global MODEL_VERSION, SIDE_DISH_THRESHOLDS
+    log.info("Loading models with the '%s' backend", MODEL_BACKEND)
+    if USE_MULTIHEAD_MODEL:
+        # One model, outputs are [main predictions, side dish predictions]
+        models = {'main': load_backend(MODEL_BACKEND, "food_multihead_model.keras"), 'side': None}
+    else:
+        models = {
+            'main': load_backend(MODEL_BACKEND, "food_classification_model.keras"),
+            'side': load_backend(MODEL_BACKEND, "nasi_lemak_side_dishes_model.keras")
+        }
+    if 'detector' in cascade.stages():
+        num_threads = os.environ.get('FDDC_TFLITE_THREADS')
+        models['detector'] = SideDishDetector(
+            DETECTOR_MODEL_PATH,
+            class_names=load_class_names(os.environ.get('FDDC_DETECTOR_CLASSES')),
+            confidence=float(os.environ.get('FDDC_DETECTOR_CONFIDENCE', '0.4')),
+            iou=float(os.environ.get('FDDC_DETECTOR_IOU', '0.3')),
+            num_threads=int(num_threads) if num_threads else None
+        )
+    SIDE_DISH_THRESHOLDS = side_dishes.load_thresholds()
+    log.info("Models loaded, side dish thresholds %s", SIDE_DISH_THRESHOLDS or "default")
+    MODEL_VERSION = model_version(MODEL_BACKEND, SIDE_DISH_SOURCE, models['main'], models['side'],
+                                  models.get('detector'), json.dumps(SIDE_DISH_THRESHOLDS, sort_keys=True),
+                                  cascade.version())
+    prediction_cache.model_version = MODEL_VERSION
+    return models
+
+def warm_up_models(models):
+    """
+    Run blank batches of each WARMUP_BATCH_SIZES size through the models
+    """
+    for batch_size in WARMUP_BATCH_SIZES:
+        blank = np.zeros((batch_size, *IMG_SIZE, 3), dtype=np.float32)
+        for name in ('main', 'side'):
+            if models[name] is not None:
+                models[name].predict(blank)
+    if models.get('detector') is not None:
+        models['detector'].warm_up()
+    log.info("Models warmed up with batch sizes %s", WARMUP_BATCH_SIZES)
+
+model_registry = ModelRegistry(load_models, warm_up_models)
+
+def start_models():
+    """
+    Start loading the models as FDDC_MODEL_LOADING says. Runs at import for
+    `python server.py`; under gunicorn each worker calls it after fork
+    (see gunicorn.conf.py).
+    """
+    if MODEL_LOADING != 'lazy':
+        model_registry.start(background=MODEL_LOADING == 'background')
+
+def get_models():
+    """
+    The loaded models, waiting up to MODEL_WAIT_TIMEOUT for them
+    Raises ModelUnavailableError, which routes answer with a 503
+    """
+    return model_registry.get(timeout=MODEL_WAIT_TIMEOUT)
+
+main_batcher = InferenceBatcher(
+    lambda batch: get_models()['main'].predict(batch),
+    max_batch_size=BATCH_MAX_SIZE,
+    max_wait_ms=BATCH_MAX_WAIT_MS,
+    name="main-model-batcher"
+)
+
+def predict_main(img_array):
+    """
+    Run the main dish classifier, batched with other in-flight requests.
+    Returns (main predictions, side dish predictions); the side dish
+    predictions come from the same forward pass with the multi-head model
+    and are None otherwise.
+    """
+    models = get_models()
+    if BATCH_MAX_SIZE <= 1:
+        outputs = models['main'].predict(img_array)
+    else:
+        outputs = main_batcher.predict(img_array)
+
+    if USE_MULTIHEAD_MODEL:
+        return outputs[0], outputs[1]
+    return outputs, None
+
+def predict_side_dishes_model(img_array):
+    """
+    Run the side dish classifier
+    """
+    if USE_MULTIHEAD_MODEL:
+        return predict_main(img_array)[1]
+    return get_models()['side'].predict(img_array)
+
+def model_unavailable_response(error):
+    response = jsonify({'error': f'Models unavailable: {str(error)}'})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
+# Food categories, nutrition info and ingredient ids, cached for
+# FDDC_REFERENCE_CACHE_TTL seconds
+reference_data = ReferenceDataCache(ttl=float(os.environ.get('FDDC_REFERENCE_CACHE_TTL', '300')))
+
+# Roboflow side dish detection: pooled keep-alive client with timeouts,
+# retries and a circuit breaker, run on its own threads alongside the main model
+ROBOFLOW_WORKERS = int(os.environ.get('FDDC_ROBOFLOW_WORKERS', '8'))
+
+roboflow_client = RoboflowClient(
+    api_url=os.environ.get('FDDC_ROBOFLOW_API_URL', 'https://detect.roboflow.com'),
+    api_key=os.environ.get('FDDC_ROBOFLOW_API_KEY', 'AePngQLn5w9bvJ0Yve4J'),
+    model_id="ingredient-2kc8g",
+    version="2",
+    timeout=float(os.environ.get('FDDC_ROBOFLOW_TIMEOUT', '10')),
+    max_retries=int(os.environ.get('FDDC_ROBOFLOW_RETRIES', '2')),
+    pool_size=ROBOFLOW_WORKERS,
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get('FDDC_ROBOFLOW_BREAKER_FAILURES', '5')),
+        reset_timeout=float(os.environ.get('FDDC_ROBOFLOW_BREAKER_RESET', '30'))
+    )
+)
+side_dish_executor = ThreadPoolExecutor(max_workers=ROBOFLOW_WORKERS, thread_name_prefix="side-dishes")
+
+# Which side dish stages each main dish class needs (see inference_cascade.py):
+# by default only nasi lemak, or any dish the main model is unsure about.
+# FDDC_CASCADE=0 runs SIDE_DISH_SOURCE for every prediction. With
+# FDDC_CASCADE_SPECULATE=1 SIDE_DISH_SOURCE starts before the main model
+# answers, trading wasted calls for the dishes that skip it for lower latency.
+cascade = inference_cascade.Cascade(
+    inference_cascade.load_rules(os.environ.get('FDDC_CASCADE_RULES'))
+    if os.environ.get('FDDC_CASCADE', '1') != '0' else inference_cascade.DISABLED_RULES,
+    SIDE_DISH_SOURCE,
+    speculate=os.environ.get('FDDC_CASCADE_SPECULATE', '0') == '1'
+)
+
+# Results for repeated images, keyed on the image bytes and MODEL_VERSION.
+# FDDC_PREDICTION_CACHE_SIZE=0 disables it; FDDC_PREDICTION_CACHE_DIR adds a disk tier.
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('FDDC_PREDICTION_CACHE_SIZE', '1024')),
+    disk_dir=os.environ.get('FDDC_PREDICTION_CACHE_DIR') or None,
+    model_version=MODEL_VERSION  # set by load_models()
+)
 
-# Load both models
-try:
-    main_model = tf.keras.models.load_model("food_classification_model.keras")
-    side_dishes_model = tf.keras.models.load_model("nasi_lemak_side_dishes_model.keras")
-    print("✅ Models loaded successfully")
-except Exception as e:
-    print(f"❌ Error loading models: {e}")
+# gunicorn.conf.py sets FDDC_LOAD_MODELS_AT_IMPORT=0 so the preloading master
+# process never loads them; each worker does after fork
+if os.environ.get('FDDC_LOAD_MODELS_AT_IMPORT', '1') == '1':
+    start_models()
+
+# Asynchronous /predict?async=1 jobs: FDDC_ASYNC_WORKERS threads, and at most
+# FDDC_ASYNC_MAX_PENDING queued or running jobs before answering 429
+prediction_jobs = JobQueue(
+    workers=int(os.environ.get('FDDC_ASYNC_WORKERS', '4')),
+    max_pending=int(os.environ.get('FDDC_ASYNC_MAX_PENDING', '64')),
+    result_ttl=float(os.environ.get('FDDC_ASYNC_RESULT_TTL', '600'))
+)
+
+# Page size of /api/predictions/history/<user_id> when no ?limit= is given, and its upper bound
+HISTORY_DEFAULT_LIMIT = int(os.environ.get('FDDC_HISTORY_DEFAULT_LIMIT', '50'))
+HISTORY_MAX_LIMIT = int(os.environ.get('FDDC_HISTORY_MAX_LIMIT', '200'))
+
+# Longest ?from= .. ?to= range served by /api/users/<id>/summary, in days
+SUMMARY_MAX_DAYS = int(os.environ.get('FDDC_SUMMARY_MAX_DAYS', '366'))
+
+# Most images accepted by one /predict/batch request
+PREDICT_BATCH_MAX_IMAGES = int(os.environ.get('FDDC_PREDICT_BATCH_MAX_IMAGES', '32'))
+
+# Set FDDC_SAVE_UPLOADS=0 to skip keeping uploaded photos in uploads/
+SAVE_UPLOADS = os.environ.get('FDDC_SAVE_UPLOADS', '1') != '0'
+
+# Numbers other components already keep, read when /metrics is scraped
+metrics.REGISTRY.collected(
+    'fddc_prediction_cache_lookups_total', 'Prediction cache lookups by result',
+    lambda: {
+        ('memory_hit',): prediction_cache.hits - prediction_cache.disk_hits,
+        ('disk_hit',): prediction_cache.disk_hits,
+        ('miss',): prediction_cache.misses
+    },
+    type='counter', labelnames=['result']
+)
+metrics.REGISTRY.collected(
+    'fddc_prediction_cache_entries', 'Prediction results held in memory',
+    lambda: prediction_cache.stats()['entries']
+)
+metrics.REGISTRY.collected(
+    'fddc_roboflow_attempts_total', 'Roboflow API attempts by outcome (timeout, http_503, success, ...)',
+    lambda: {(outcome,): count for outcome, count in roboflow_client.outcome_counts().items()},
+    type='counter', labelnames=['outcome']
+)
+metrics.REGISTRY.collected(
+    'fddc_roboflow_circuit_open', '1 while the Roboflow circuit breaker is open',
+    lambda: 0 if roboflow_client.breaker.state == 'closed' else 1
+)
+metrics.REGISTRY.collected(
+    'fddc_db_pool_connections', 'Pooled database connections by state',
+    lambda: {
+        ('in_use',): db_pool.pool_status()['in_use'],
+        ('size',): db_pool.pool_status()['size']
+    },
+    labelnames=['state']
+)
+metrics.REGISTRY.collected(
+    'fddc_async_jobs', 'Asynchronous /predict jobs by status',
+    lambda: {(status,): prediction_jobs.stats()[status] for status in ('queued', 'running', 'done', 'failed')},
+    labelnames=['status']
+)
+metrics.REGISTRY.collected(
+    'fddc_models_ready', '1 once the models are loaded and warmed up',
+    lambda: 1 if model_registry.ready else 0
+)
 
 # Define food labels
 main_labels = ["Cendol", "Ketupat", "Laksa", "Nasi Ayam", "Nasi Lemak"]
-side_dish_labels = ["Ikan Bilis", "Telur", "Sambal", "Timun", "Kacang"]
+side_dish_labels = side_dishes.LABELS
+
+def observe_image_save(seconds):
+    STAGE_SECONDS.observe(seconds, stage='image_save')
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Label by route pattern, not the raw path, to keep the series bounded
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    if 'request_start' in g:
+        REQUEST_SECONDS.observe(time.perf_counter() - g.request_start, endpoint=endpoint, method=request.method)
+    REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
 
 def get_db_connection():
-    return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="",
-        database="food_classifier_db"
+    """
+    Pooled database connection for the current request. It is handed back
+    to the pool (with any uncommitted work rolled back) when the request
+    ends, including when the route raised.
+    """
+    if 'db_conn' not in g:
+        with STAGE_SECONDS.time(stage='db_checkout'):
+            g.db_conn = db_pool.get_connection()
+    return g.db_conn
+
+@app.teardown_appcontext
+def release_db_connection(exception):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        db_pool.release_connection(conn)
+
+def detect_side_dishes_roboflow(image_bytes):
+    """
+    Detect side dishes using Roboflow API
+    Raises RoboflowError when the API can't be used so callers can fall back
+    """
+    with STAGE_SECONDS.time(stage='roboflow'):
+        detections = roboflow_client.detect(image_bytes)
+    log.debug("Roboflow side dish predictions for a %d byte image: %s", len(image_bytes), detections)
+    return detections
+
+def detect_side_dishes_detector(image_bytes):
+    """
+    Detect side dishes with the local object detector
+    Raises DetectorError when detection fails so callers can fall back
+    """
+    with STAGE_SECONDS.time(stage='detector'):
+        detections = get_models()['detector'].detect(image_bytes)
+    log.debug("Detector side dish predictions for a %d byte image: %s", len(image_bytes), detections)
+    return detections
+
+def start_side_dish_detection(image_bytes, stage):
+    """
+    Start Roboflow or local detector side dish detection for an image on
+    side_dish_executor
+    Returns the Future, or None for the local classifier, which runs inline
+    """
+    if stage == 'roboflow':
+        return side_dish_executor.submit(detect_side_dishes_roboflow, image_bytes)
+    if stage == 'detector':
+        return side_dish_executor.submit(detect_side_dishes_detector, image_bytes)
+    return None
+
+def speculate_side_dishes(image_bytes):
+    """
+    Start the cascade's speculative stage before the main model answers,
+    so it overlaps with inference
+    Returns (stage, Future), or None when the cascade doesn't speculate
+    """
+    stage = cascade.speculative_stage
+    if stage is None:
+        return None
+    return stage, start_side_dish_detection(image_bytes, stage)
+
+def read_main_prediction(predictions):
+    """
+    (class name, confidence between 0 and 1) from one image's main model output
+    """
+    predicted_class = np.argmax(predictions)
+    class_name = main_labels[predicted_class].lower()
+    confidence = float(predictions[0][predicted_class])  # Already between 0 and 1
+    log.debug("Main dish prediction: %s with confidence %.2f%%", class_name, confidence * 100)
+    PREDICTIONS.inc(class_name=class_name, source='model')
+    return class_name, confidence
+
+def route_side_dishes(image_bytes, class_name, confidence, speculation=None):
+    """
+    Pick the cascade route for a main dish prediction and start its first
+    stage, reusing the speculative one when the route starts with it
+    Returns (route, Future for the first stage or None)
+    """
+    route = cascade.route(class_name, confidence)
+    future = None
+    if speculation is not None:
+        stage, speculative_future = speculation
+        if route and route[0] == stage:
+            future = speculative_future
+        elif not speculative_future.cancel():
+            # Already running: the call is made, its result goes unused
+            CASCADE_STAGES.inc(stage=stage, outcome='wasted')
+    if future is None and route:
+        future = start_side_dish_detection(image_bytes, route[0])
+    # The stage every prediction used to run; counts what the cascade saves
+    if cascade.default[0] not in route:
+        CASCADE_STAGES.inc(stage=cascade.default[0], outcome='skipped')
+    return route, future
+
+def collect_side_dishes(route, side_dish_future, image_bytes, img_array, side_predictions=None):
+    """
+    Side dishes for /predict from the first stage of route that succeeds:
+    side_dish_future holds the first stage's detection when it runs on
+    side_dish_executor, later stages only start if the earlier ones fail
+    Returns (side dishes, whether a fallback stage had to be used)
+    """
+    for i, stage in enumerate(route):
+        CASCADE_STAGES.inc(stage=stage, outcome='run')
+        if stage == 'local':
+            return detect_side_dishes_local(img_array, side_predictions), i > 0
+        future = side_dish_future if i == 0 else start_side_dish_detection(image_bytes, stage)
+        try:
+            # Only the part of the detection that outlasted the main model
+            with STAGE_SECONDS.time(stage=f'{stage}_wait'):
+                return future.result(), i > 0
+        except (RoboflowError, DetectorError) as e:
+            log.warning("Side dish %s unavailable (%s), trying the next stage of %s", stage, e, route)
+            SIDE_DISH_FALLBACKS.inc()
+    # Nothing to run, or every stage failed
+    return [], len(route) > 0
+
+def finish_classification(cache_key, class_name, confidence, route, side_dish_future, image_bytes, img_array,
+                          side_predictions=None):
+    """
+    Turn one image's main dish prediction and side dish detection into a
+    result, and cache it
+    """
+    side_dish_predictions, used_fallback = collect_side_dishes(
+        route, side_dish_future, image_bytes, img_array, side_predictions
     )
 
-def detect_side_dishes_roboflow(image_path):
+    result = {
+        'class_name': class_name,
+        'confidence': confidence,
+        'ingredients': side_dish_predictions
+    }
+    # Don't keep serving the fallback answer once Roboflow is back
+    if not used_fallback:
+        prediction_cache.put(cache_key, result)
+    return result
+
+def tta_views_param():
     """
-    Detect side dishes using Roboflow API with Python requests
-    Cross-platform implementation that works on Windows and Unix
+    Views for this request: ?tta=<views> (or a form/JSON 'tta' field),
+    clamped to what tta supports, defaulting to TTA_VIEWS
     """
+    value = request.args.get('tta') or request.form.get('tta')
+    if value is None and request.is_json:
+        value = (request.get_json(silent=True) or {}).get('tta')
     try:
-        print(f"📸 Detecting side dishes in {image_path} using Roboflow API (cross-platform method)...")
-        
-        # Check if file exists
-        if not os.path.exists(image_path):
-            print(f"❌ ERROR: Image file does not exist: {image_path}")
-            return []
-        
-        # Import required libraries
+        views = int(value) if value not in (None, '') else TTA_VIEWS
+    except (TypeError, ValueError):
+        views = TTA_VIEWS
+    return min(max(views, 1), tta.MAX_VIEWS)
+
+def preprocess_upload(img_bytes, tta_views):
+    """
+    Model input for an upload: one image, or its tta_views augmented views
+    """
+    try:
+        with STAGE_SECONDS.time(stage='preprocess'):
+            if tta_views > 1:
+                return tta.preprocess_views(img_bytes, tta_views)[0]
+            return preprocess_image(img_bytes)[0]
+    except Exception as e:
+        raise ImageProcessingError(f'Error processing image: {str(e)}')
+
+def prediction_cache_key(img_bytes, tta_views):
+    # TTA results differ from single-view ones, so they're cached separately
+    namespace = 'predict' if tta_views <= 1 else f'predict-tta{tta_views}'
+    return prediction_cache.key(namespace, img_bytes)
+
+def classify_upload(img_bytes, tta_views=1):
+    """
+    Main dish and side dishes for an uploaded image, answered from the
+    prediction cache when the same image was classified before. With
+    tta_views > 1 the main model's outputs over that many views (one
+    batched call) are averaged.
+    Returns {'class_name', 'confidence' (between 0 and 1), 'ingredients'}
+    """
+    # Cache keys include MODEL_VERSION, which is known once the models are loaded
+    get_models()
+    with STAGE_SECONDS.time(stage='cache_lookup'):
+        cache_key = prediction_cache_key(img_bytes, tta_views)
+        result = prediction_cache.get(cache_key)
+    if result is not None:
+        log.debug("Prediction cache hit: %s", result['class_name'])
+        PREDICTIONS.inc(class_name=result['class_name'], source='cache')
+        return result
+
+    # Decode once and preprocess in memory
+    img_array = preprocess_upload(img_bytes, tta_views)
+
+    # Start side dish detection now if the cascade speculates, so it overlaps with the main model
+    speculation = speculate_side_dishes(img_bytes)
+
+    # Make main dish prediction; the views go through the batcher as one item
+    with STAGE_SECONDS.time(stage='inference'):
+        predictions, side_predictions = predict_main(img_array)
+    if tta_views > 1:
+        predictions = tta.average(predictions)
+        side_predictions = tta.average(side_predictions) if side_predictions is not None else None
+    class_name, confidence = read_main_prediction(predictions)
+    route, side_dish_future = route_side_dishes(img_bytes, class_name, confidence, speculation)
+    # The local side dish model (if needed) only looks at the plain view
+    return finish_classification(cache_key, class_name, confidence, route, side_dish_future, img_bytes,
+                                 img_array[:1], side_predictions)
+
+def classify_uploads(images, tta_views=1):
+    """
+    classify_upload for many images at once: every image that isn't cached
+    goes through the main model in a single batch (tta_views rows each)
+    Returns a result, or the ImageProcessingError, for each image
+    """
+    get_models()
+    results = [None] * len(images)
+    pending = []
+    for i, img_bytes in enumerate(images):
+        with STAGE_SECONDS.time(stage='cache_lookup'):
+            cache_key = prediction_cache_key(img_bytes, tta_views)
+            results[i] = prediction_cache.get(cache_key)
+        if results[i] is not None:
+            PREDICTIONS.inc(class_name=results[i]['class_name'], source='cache')
+            continue
         try:
-            import requests
-            import base64
-            import json
-        except ImportError as e:
-            print(f"❌ ERROR: Required library not found: {e}")
-            print("Please install required libraries: pip install requests")
-            return []
-        
-        # API configuration
-        api_key = "AePngQLn5w9bvJ0Yve4J"
-        model_id = "ingredient-2kc8g"
-        version = "2"
-        
-        # Build the API URL
-        api_url = f"https://detect.roboflow.com/{model_id}/{version}?api_key={api_key}"
-        print(f"🔄 Preparing API request to model '{model_id}/{version}'")
-        
-        # Read and encode image file
-        with open(image_path, "rb") as image_file:
-            image_data = image_file.read()
-            image_base64 = base64.b64encode(image_data).decode("utf-8")
-        
-        # Make the API request
-        print("🔄 Sending request to Roboflow API...")
-        response = requests.post(
-            api_url,
-            data=image_base64,
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
+            img_array = preprocess_upload(img_bytes, tta_views)
+        except ImageProcessingError as e:
+            results[i] = e
+            continue
+        pending.append((i, cache_key, img_array))
+
+    if not pending:
+        return results
+
+    speculations = {i: speculate_side_dishes(images[i]) for i, _, _ in pending}
+
+    # One model call for the whole upload (the batcher runs oversized batches on their own)
+    with STAGE_SECONDS.time(stage='inference'):
+        main_outputs, side_outputs = predict_main(np.concatenate([img_array for _, _, img_array in pending]))
+
+    # Route every image first, so their side dish stages run concurrently
+    routed = []
+    for row, (i, cache_key, img_array) in enumerate(pending):
+        rows = slice(row * tta_views, (row + 1) * tta_views)
+        predictions = tta.average(main_outputs[rows])
+        side_predictions = tta.average(side_outputs[rows]) if side_outputs is not None else None
+        class_name, confidence = read_main_prediction(predictions)
+        route, side_dish_future = route_side_dishes(images[i], class_name, confidence, speculations[i])
+        routed.append((i, cache_key, img_array, side_predictions, class_name, confidence, route, side_dish_future))
+
+    for i, cache_key, img_array, side_predictions, class_name, confidence, route, side_dish_future in routed:
+        results[i] = finish_classification(
+            cache_key, class_name, confidence, route, side_dish_future, images[i], img_array[:1], side_predictions
         )
-        
-        # Check if request was successful
-        if response.status_code != 200:
-            print(f"❌ API request failed with status code: {response.status_code}")
-            print(f"❌ Response: {response.text}")
-            return []
-        
-        # Parse the JSON result
-        try:
-            response_json = response.json()
-            print(f"✅ Raw Roboflow API response: {response_json}")
-            
-            # Check for error responses
-            if isinstance(response_json, dict) and 'message' in response_json:
-                if response_json['message'] == 'Forbidden':
-                    print("❌ API Error: Forbidden - Check your API key and model permissions")
-                    return []
-                    
-            # Extract predictions
-            detections = []
-            if "predictions" in response_json:
-                for pred in response_json["predictions"]:
-                    class_name = pred.get("class", "Unknown")
-                    confidence = pred.get("confidence", 0)
-                    
-                    detections.append({
-                        'name': class_name,
-                        'confidence': round(confidence * 100, 2)  # Convert to percentage
-                    })
-                    print(f"📌 Detected {class_name} with confidence {confidence * 100:.2f}%")
-                
-                # Sort by confidence
-                detections = sorted(detections, key=lambda x: x['confidence'], reverse=True)
-            else:
-                print("🔍 No side dish predictions found in result")
-            
-            print(f"✅ Side dish detections: {detections}")
-            return detections
-                
-        except json.JSONDecodeError as e:
-            print(f"❌ Failed to parse JSON response: {e}")
-            print(f"Response: {response.text}")
-            return []
-            
-    except Exception as e:
-        print(f"❌ Roboflow detection error: {str(e)}")
-        print(f"❌ Error type: {type(e)}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
-        return []
+    return results
 
-def detect_side_dishes_local(img_array):
+def save_prediction_rows(cursor, user_id, category_id, confidence, image_path, side_dish_predictions):
     """
-    Detect side dishes using local TensorFlow model
-    Returns prediction for Ikan Bilis (currently only one class)
+    Insert a food_predictions row and its detected side dishes; the caller commits
+    Returns the new prediction id
     """
-    prediction = side_dishes_model.predict(img_array)
-    confidence = float(prediction[0][0])  # Already between 0 and 1
+    # Save main prediction (confidence already between 0 and 1)
+    cursor.execute("""
+        INSERT INTO food_predictions 
+        (user_id, food_category_id, confidence, image_path) 
+        VALUES (%s, %s, %s, %s)
+    """, (user_id, category_id, confidence, image_path))
     
-    # Lower threshold for detection from 0.5 to 0.3
-    is_present = confidence > 0.3
+    prediction_id = cursor.lastrowid
     
-    # Print raw confidence for debugging
-    print(f"🍲 Side dish raw confidence: {confidence:.4f} (Threshold: 0.3)")
+    # Save detected side dishes that are known ingredients
+    ingredient_rows = []
+    for side_dish in side_dish_predictions:
+        ingredient_id = reference_data.ingredient_id(side_dish['name'])
+        if ingredient_id is not None:
+            ingredient_rows.append((prediction_id, ingredient_id, side_dish['confidence'] / 100.0))
+    if ingredient_rows:
+        cursor.executemany("""
+            INSERT INTO prediction_ingredients 
+            (prediction_id, ingredient_id, confidence) 
+            VALUES (%s, %s, %s)
+        """, ingredient_rows)
     
-    if is_present:
-        print(f"✅ Detected Ikan Bilis with {confidence * 100:.2f}% confidence")
-        return [{
-            'name': 'Ikan Bilis',
-            'confidence': round(confidence * 100, 2)  # Convert to percentage
-        }]
-    else:
-        print(f"❌ No Ikan Bilis detected (confidence: {confidence * 100:.2f}%)")
-    return []  # Return empty list if side dish is not detected
+    # Add the meal to the user's daily totals in the same transaction
+    daily_summary.record_meal(cursor, user_id, reference_data.nutrition(category_id))
+    
+    return prediction_id
+
+def detect_side_dishes_local(img_array, prediction=None):
+    """
+    Detect side dishes using the local multi-label model: every label whose
+    probability clears its calibrated threshold, most confident first
+    Pass prediction to reuse side dish output the multi-head model already computed
+    """
+    if prediction is None:
+        with STAGE_SECONDS.time(stage='side_dish_model'):
+            prediction = predict_side_dishes_model(img_array)
+    detected, all_predictions = side_dishes.decode(prediction[0], SIDE_DISH_THRESHOLDS)
+    log.debug("Side dish confidences: %s", all_predictions)
+    return detected
+
+def estimate_portions(img_bytes, side_dish_predictions):
+    """
+    Per-item calories and macros for the detected side dishes, scaled by
+    how much of the photo each one's box covers
+    """
+    with STAGE_SECONDS.time(stage='portion_estimate'):
+        return portion_estimator.estimate(side_dish_predictions, image_size(img_bytes))
+
+def encode_history_cursor(prediction):
+    value = f"{prediction['created_at'].isoformat()}|{prediction['id']}"
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+def decode_history_cursor(cursor_param):
+    created_at, prediction_id = base64.urlsafe_b64decode(cursor_param.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(prediction_id)
 
 @app.route('/api/predictions/history/<int:user_id>', methods=['GET'])
 def get_user_predictions(user_id):
+    """
+    A user's predictions, newest first, one page at a time. Pass ?limit= for
+    the page size and ?cursor= with the X-Next-Cursor header of the previous
+    page to continue; the header is absent on the last page.
+    """
     try:
+        limit = min(max(request.args.get('limit', HISTORY_DEFAULT_LIMIT, type=int), 1), HISTORY_MAX_LIMIT)
+        cursor_param = request.args.get('cursor')
+        try:
+            after = decode_history_cursor(cursor_param) if cursor_param else None
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
         
+        # Keyset pagination on (user_id, created_at, id), served by the
+        # idx_food_predictions_user_history index (add_history_indexes.sql).
+        # Only predictions with at least one detected ingredient are listed.
         query = """
-        SELECT 
-            p.*, 
-            f.name as food_name, 
-            f.description as food_description,
-            fi.calories, fi.protein, fi.carbs, fi.fats,
-            GROUP_CONCAT(
-                CONCAT(i.name, ':', pi.confidence * 100)
-                ORDER BY pi.confidence DESC
-                SEPARATOR ','
-            ) as ingredients
+        SELECT p.*
         FROM food_predictions p
-        LEFT JOIN food_categories f ON p.food_category_id = f.id
-        LEFT JOIN food_info fi ON p.food_category_id = fi.food_category_id
-        LEFT JOIN prediction_ingredients pi ON p.id = pi.prediction_id
-        LEFT JOIN ingredients i ON pi.ingredient_id = i.id
-        WHERE p.user_id = %s AND i.name IS NOT NULL
-        GROUP BY p.id
-        ORDER BY p.created_at DESC
+        WHERE p.user_id = %s
+        AND EXISTS (
+            SELECT 1 FROM prediction_ingredients pi
+            JOIN ingredients i ON pi.ingredient_id = i.id
+            WHERE pi.prediction_id = p.id
+        )
         """
-        cursor.execute(query, (user_id,))
+        params = [user_id]
+        if after:
+            query += " AND (p.created_at < %s OR (p.created_at = %s AND p.id < %s))"
+            params += [after[0], after[0], after[1]]
+        query += " ORDER BY p.created_at DESC, p.id DESC LIMIT %s"
+        params.append(limit + 1)
+        
+        cursor.execute(query, params)
         predictions = cursor.fetchall()
         
+        next_cursor = None
+        if len(predictions) > limit:
+            predictions = predictions[:limit]
+            next_cursor = encode_history_cursor(predictions[-1])
+        
+        # Ingredients for the whole page in one batched query
+        ingredients_by_prediction = {pred['id']: [] for pred in predictions}
+        if predictions:
+            placeholders = ', '.join(['%s'] * len(predictions))
+            cursor.execute(f"""
+                SELECT pi.prediction_id, i.name, pi.confidence * 100 AS confidence
+                FROM prediction_ingredients pi
+                JOIN ingredients i ON pi.ingredient_id = i.id
+                WHERE pi.prediction_id IN ({placeholders})
+                ORDER BY pi.prediction_id, pi.confidence DESC
+            """, list(ingredients_by_prediction))
+            for row in cursor.fetchall():
+                ingredients_by_prediction[row['prediction_id']].append({
+                    'name': row['name'],
+                    'confidence': float(row['confidence'])
+                })
+        cursor.close()
+        
         for pred in predictions:
+            # Category names and nutrition come from the reference data cache
+            category = reference_data.category(pred['food_category_id']) or {}
+            nutrition_info = reference_data.nutrition(pred['food_category_id']) or {}
+            pred['food_name'] = category.get('name')
+            pred['food_description'] = category.get('description')
+            for field in ('calories', 'protein', 'carbs', 'fats'):
+                value = nutrition_info.get(field)
+                pred[field] = float(value) if value else value
             pred['created_at'] = pred['created_at'].isoformat()
             pred['confidence'] = float(pred['confidence'])
-            if pred['calories']:
-                pred['calories'] = float(pred['calories'])
-            if pred['protein']:
-                pred['protein'] = float(pred['protein'])
-            if pred['carbs']:
-                pred['carbs'] = float(pred['carbs'])
-            if pred['fats']:
-                pred['fats'] = float(pred['fats'])
-            if pred['ingredients']:
-                # Parse the concatenated string into a list of ingredients
-                ingredients_list = []
-                for item in pred['ingredients'].split(','):
-                    name, confidence = item.split(':')
-                    ingredients_list.append({
-                        'name': name,
-                        'confidence': float(confidence)
-                    })
-                pred['ingredients'] = ingredients_list
-            else:
-                pred['ingredients'] = []
+            pred['ingredients'] = ingredients_by_prediction[pred['id']]
         
-        cursor.close()
-        conn.close()
-        return jsonify(predictions)
+        response = jsonify(predictions)
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
     
     except Exception as e:
-        print(f"Error in get_user_predictions: {str(e)}")  # Add debug print
+        log.exception("Error in get_user_predictions")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/predictions', methods=['POST'])
@@ -234,19 +743,21 @@ def save_prediction():
         VALUES (%s, %s, %s, %s, %s)
         """
         
+        created_at = datetime.now()
         cursor.execute(query, (
             data['user_id'],
             data['food_id'],
             data['confidence'],
             data['image_path'],
-            datetime.now()
+            created_at
         ))
-        
-        conn.commit()
         prediction_id = cursor.lastrowid
+        daily_summary.record_meal(
+            cursor, data['user_id'], reference_data.nutrition(data['food_id']), created_at.date()
+        )
         
+        conn.commit()
         cursor.close()
-        conn.close()
         
         return jsonify({
             'id': prediction_id,
@@ -254,14 +765,58 @@ def save_prediction():
         })
         
     except Exception as e:
-        # Print detailed error information
-        import traceback
-        error_traceback = traceback.format_exc()
-        print(f"❌ Error in save_prediction: {str(e)}")
-        print(f"❌ Request data: {request.data}")
-        print(f"❌ Traceback: {error_traceback}")
+        log.exception("Error in save_prediction (request data: %r)", request.data)
         return jsonify({'error': str(e)}), 500
 
+def run_prediction(user_id, img_bytes, tta_views=1):
+    """
+    Classify an upload and record it in the user's history
+    Returns (response payload, HTTP status); also runs outside a request
+    for asynchronous /predict jobs
+    """
+    try:
+        result = classify_upload(img_bytes, tta_views)
+    except ImageProcessingError as e:
+        log.warning("%s", e)
+        return {'error': str(e)}, 500
+    except ModelUnavailableError as e:
+        return {'error': f'Models unavailable: {str(e)}'}, 503
+    class_name = result['class_name']
+    confidence = result['confidence']
+    side_dish_predictions = result['ingredients']
+    
+    # Keep the original image (as JPEG) for the prediction history, off the hot path
+    timestamp = int(time.time())
+    image_path = os.path.join('uploads', f'prediction_{user_id}_{timestamp}.jpg')
+    if SAVE_UPLOADS:
+        save_image_async(img_bytes, image_path, observe=observe_image_save)
+    
+    # Resolve the category and its nutrition from the cached reference data
+    category = reference_data.category_by_name(class_name)
+    if not category:
+        return {'error': 'Food category not found'}, 404
+    category_id = category['id']
+    
+    # Save to database
+    with STAGE_SECONDS.time(stage='db_write'), db_pool.db_session() as conn:
+        cursor = conn.cursor()
+        save_prediction_rows(cursor, user_id, category_id, confidence, image_path, side_dish_predictions)
+        conn.commit()
+    
+    # Build response with nutritional information if available
+    response = {
+        'class_name': class_name,
+        'confidence': round(confidence * 100, 2),  # Convert to percentage only when returning
+        'ingredients': side_dish_predictions,
+        'portion_nutrition': estimate_portions(img_bytes, side_dish_predictions)
+    }
+    
+    nutrition_info = reference_data.nutrition(category_id)
+    if nutrition_info:
+        response.update(nutrition_info)
+    
+    return response, 200
+
 @app.route('/predict', methods=['POST'])
 def predict_main_dish():
     try:
@@ -270,212 +825,157 @@ def predict_main_dish():
         if not user_id:
             return jsonify({'error': 'User ID is required'}), 400
 
-        # Check if request has a file or JSON
+        # Read the upload straight into memory
         if 'file' in request.files:
             file = request.files['file']
-            print(f"📊 DEBUG: Received file: {file.filename}, MIME type: {file.content_type}")
-            
-            # Create uploads directory if it doesn't exist
-            os.makedirs('uploads', exist_ok=True)
-            
-            # Generate a unique filename with proper extension
-            timestamp = int(time.time())
-            filename = f'prediction_{user_id}_{timestamp}.jpg'
-            image_path = os.path.join('uploads', filename)
-            
-            # Properly handle the image data
-            try:
-                # Save the image
-                file.save(image_path)
-                
-                # Verify the saved file
-                if os.path.exists(image_path):
-                    filesize = os.path.getsize(image_path)
-                    print(f"✅ Image saved successfully to {image_path} (Size: {filesize} bytes)")
-                    
-                    # Attempt to open the image to verify integrity
-                    img = Image.open(image_path)
-                    img_format = img.format
-                    img_size = img.size
-                    print(f"✅ Image verified: Format: {img_format}, Size: {img_size[0]}x{img_size[1]}")
-                    
-                    # Ensure image is in JPEG format
-                    if img_format != 'JPEG':
-                        print(f"⚠️ Converting image from {img_format} to JPEG format")
-                        img = img.convert('RGB')
-                        img.save(image_path, 'JPEG', quality=90)
-                        print(f"✅ Image converted to JPEG and saved to {image_path}")
-                else:
-                    print(f"❌ Failed to save image: File does not exist at {image_path}")
-                    return jsonify({'error': 'Failed to save uploaded image'}), 500
-            except Exception as e:
-                print(f"❌ Error saving or processing image: {str(e)}")
-                return jsonify({'error': f'Error processing image: {str(e)}'}), 500
-                
+            log.debug("Received file: %s, MIME type: %s", file.filename, file.content_type)
+            with STAGE_SECONDS.time(stage='read_upload'):
+                img_bytes = file.read()
         elif request.is_json:
-            img_data = request.json['image']
-            if "," in img_data:  # Handle base64 format with data URI prefix
-                img_bytes = base64.b64decode(img_data.split(',')[1])
-            else:
-                img_bytes = base64.b64decode(img_data)
-                
-            # Use PIL to verify and process the image
-            try:
-                img = Image.open(io.BytesIO(img_bytes))
-                
-                # Create uploads directory and save
-                os.makedirs('uploads', exist_ok=True)
-                timestamp = int(time.time())
-                image_path = f'uploads/prediction_{user_id}_{timestamp}.jpg'
-                
-                # Convert to RGB if needed and save as JPEG
-                img = img.convert('RGB')
-                img.save(image_path, format='JPEG', quality=90)
-                print(f"✅ Base64 image saved to {image_path}")
-            except Exception as e:
-                print(f"❌ Error processing base64 image: {str(e)}")
-                return jsonify({'error': f'Error processing image: {str(e)}'}), 500
+            with STAGE_SECONDS.time(stage='read_upload'):
+                img_bytes = decode_base64_image(request.json['image'])
         else:
             return jsonify({'error': 'No image provided'}), 400
+
+        # ?async=1: answer with a job id now and predict on the worker pool
+        if request.args.get('async') in ('1', 'true'):
+            try:
+                job_id = prediction_jobs.submit(run_prediction, user_id, img_bytes, tta_views_param())
+            except QueueFullError as e:
+                response = jsonify({'error': f'Too many pending predictions ({str(e)}), try again later'})
+                response.headers['Retry-After'] = '1'
+                return response, 429
+            return jsonify({
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f'/predict/jobs/{job_id}'
+            }), 202
+        
+        payload, status_code = run_prediction(user_id, img_bytes, tta_views_param())
+        return jsonify(payload), status_code
+        
+    except Exception as e:
+        log.exception("Error in predict_main_dish")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/predict/jobs/<job_id>', methods=['GET'])
+def get_prediction_job(job_id):
+    job = prediction_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Classify several images in one request, as multipart 'files' or a JSON
+    list of base64 'images'. All predictions are saved in one transaction.
+    """
+    try:
+        if request.files:
+            user_id = request.form.get('user_id')
+            images = [file.read() for file in request.files.getlist('files')]
+        elif request.is_json:
+            user_id = request.json.get('user_id')
+            images = [decode_base64_image(img_data) for img_data in request.json.get('images', [])]
+        else:
+            return jsonify({'error': 'No images provided'}), 400
+        
+        if not user_id:
+            return jsonify({'error': 'User ID is required'}), 400
+        if not images:
+            return jsonify({'error': 'No images provided'}), 400
+        if len(images) > PREDICT_BATCH_MAX_IMAGES:
+            return jsonify({'error': f'At most {PREDICT_BATCH_MAX_IMAGES} images per request'}), 413
+        
+        results = classify_uploads(images, tta_views_param())
         
-        # Resize and preprocess the image
-        try:
-            img = Image.open(image_path)
-            img = img.resize((224, 224))
-            img_array = image.img_to_array(img)
-            img_array = np.expand_dims(img_array, axis=0)
-            img_array = img_array / 255.0
-        except Exception as e:
-            print(f"❌ Error preprocessing image: {str(e)}")
-            return jsonify({'error': f'Error preprocessing image: {str(e)}'}), 500
-        
-        # Make main dish prediction
-        predictions = main_model.predict(img_array)
-        predicted_class = np.argmax(predictions)
-        class_name = main_labels[predicted_class].lower()
-        confidence = float(predictions[0][predicted_class])  # Already between 0 and 1
-        print(f"🍽️ Main dish prediction: {class_name} with confidence {confidence * 100:.2f}%")
-
-        # Use only Roboflow for side dish detection
-        print("🔍 Starting side dish detection with Roboflow...")
-        side_dish_predictions = detect_side_dishes_roboflow(image_path)
-        print(f"✅ Roboflow side dish predictions: {side_dish_predictions}")
-        
-        # Save to database
         conn = get_db_connection()
         cursor = conn.cursor()
-        
-        # Get food category id
-        cursor.execute("SELECT id FROM food_categories WHERE name = %s", (class_name,))
-        category = cursor.fetchone()
-        
-        if category:
-            category_id = category[0]
-            # Save main prediction (confidence already between 0 and 1)
-            cursor.execute("""
-                INSERT INTO food_predictions 
-                (user_id, food_category_id, confidence, image_path) 
-                VALUES (%s, %s, %s, %s)
-            """, (user_id, category_id, confidence, image_path))
-            
-            prediction_id = cursor.lastrowid
+        timestamp = int(time.time())
+        nutrition_by_class = {}
+        response = []
+        
+        for i, (img_bytes, result) in enumerate(zip(images, results)):
+            if isinstance(result, ImageProcessingError):
+                response.append({'index': i, 'error': str(result)})
+                continue
             
-            # Save detected side dishes
-            for side_dish in side_dish_predictions:
-                # Get or create ingredient
-                cursor.execute("SELECT id FROM ingredients WHERE name = %s", (side_dish['name'],))
-                ingredient = cursor.fetchone()
-                if ingredient:
-                    cursor.execute("""
-                        INSERT INTO prediction_ingredients 
-                        (prediction_id, ingredient_id, confidence) 
-                        VALUES (%s, %s, %s)
-                    """, (prediction_id, ingredient[0], side_dish['confidence'] / 100.0))
+            class_name = result['class_name']
+            category = reference_data.category_by_name(class_name)
+            if not category:
+                response.append({'index': i, 'error': 'Food category not found'})
+                continue
             
-            conn.commit()
+            image_path = os.path.join('uploads', f'prediction_{user_id}_{timestamp}_{i}.jpg')
+            if SAVE_UPLOADS:
+                save_image_async(img_bytes, image_path, observe=observe_image_save)
             
-            # Get nutritional information for the food
-            cursor.execute("""
-                SELECT calories, protein, carbs, fats 
-                FROM food_info 
-                WHERE food_category_id = %s
-            """, (category_id,))
+            prediction_id = save_prediction_rows(
+                cursor, user_id, category['id'], result['confidence'], image_path, result['ingredients']
+            )
             
-            nutrition_info = cursor.fetchone()
-            
-            # Build response with nutritional information if available
-            response = {
+            item = {
+                'index': i,
+                'id': prediction_id,
                 'class_name': class_name,
-                'confidence': round(confidence * 100, 2),  # Convert to percentage only when returning
-                'ingredients': side_dish_predictions
+                'confidence': round(result['confidence'] * 100, 2),
+                'ingredients': result['ingredients'],
+                'portion_nutrition': estimate_portions(img_bytes, result['ingredients'])
             }
-            
-            if nutrition_info:
-                calories, protein, carbs, fats = nutrition_info
-                response.update({
-                    'calories': calories,
-                    'protein': protein,
-                    'carbs': carbs,
-                    'fats': fats
-                })
-            
-            return jsonify(response)
+            if class_name not in nutrition_by_class:
+                nutrition_by_class[class_name] = reference_data.nutrition(category['id'])
+            if nutrition_by_class[class_name]:
+                item.update(nutrition_by_class[class_name])
+            response.append(item)
         
-        return jsonify({'error': 'Food category not found'}), 404
+        conn.commit()
+        return jsonify({'predictions': response})
         
+    except ModelUnavailableError as e:
+        return model_unavailable_response(e)
     except Exception as e:
-        print(f"❌ Error in predict_main_dish: {str(e)}")
-        import traceback
-        print(f"❌ Traceback: {traceback.format_exc()}")
+        log.exception("Error in predict_batch")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/predict/side-dishes', methods=['POST'])
 def predict_side_dishes():
     try:
         # Get the image from the POST request
-        img_data = request.json['image']
-        img_bytes = base64.b64decode(img_data.split(',')[1])
+        img_bytes = decode_base64_image(request.json['image'])
         
-        # Convert to PIL Image
-        img = Image.open(io.BytesIO(img_bytes))
-        img = img.resize((224, 224))
+        get_models()
+        cache_key = prediction_cache.key('side-dishes', img_bytes)
+        cached = prediction_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(cached)
         
-        # Convert to array and preprocess
-        img_array = image.img_to_array(img)
-        img_array = np.expand_dims(img_array, axis=0)
-        img_array = img_array / 255.0
+        # Preprocess it in memory
+        img_array, _ = preprocess_image(img_bytes)
         
         # Make prediction
-        prediction = side_dishes_model.predict(img_array)
-        confidence = float(prediction[0][0])
-        
-        # Lower threshold for detection from 0.5 to 0.3
-        is_present = confidence > 0.3
-        
-        # Print raw confidence for debugging
-        print(f"🍲 Side dishes endpoint - Raw confidence: {confidence:.4f} (Threshold: 0.3)")
-        
-        # Format results
-        detected_sides = []
-        if is_present:
-            print(f"✅ Side dishes endpoint - Detected Ikan Bilis with {confidence * 100:.2f}% confidence")
-            detected_sides.append({
-                'name': 'Ikan Bilis',
-                'confidence': round(confidence * 100, 2)
-            })
-        else:
-            print(f"❌ Side dishes endpoint - No Ikan Bilis detected (confidence: {confidence * 100:.2f}%)")
+        with STAGE_SECONDS.time(stage='side_dish_model'):
+            prediction = predict_side_dishes_model(img_array)
+        detected_sides, all_predictions = side_dishes.decode(prediction[0], SIDE_DISH_THRESHOLDS)
         
-        return jsonify({
+        log.debug("Side dishes endpoint - confidences: %s", all_predictions)
+        
+        result = {
             'detected_sides': detected_sides,
-            'all_predictions': {
-                'Ikan Bilis': round(confidence * 100, 2)
-            }
-        })
+            'all_predictions': all_predictions
+        }
+        prediction_cache.put(cache_key, result)
+        return jsonify(result)
         
+    except ModelUnavailableError as e:
+        return model_unavailable_response(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/prediction-cache/stats', methods=['GET'])
+def prediction_cache_stats():
+    return jsonify(prediction_cache.stats()), 200
+
 # New endpoints for user registration and authentication
 @app.route('/api/register', methods=['POST'])
 def register():
@@ -502,13 +1002,11 @@ def register():
         # Check if username already exists
         cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
         if cursor.fetchone():
-            conn.close()
             return jsonify({'error': 'Username already exists'}), 409
         
         # Check if email already exists
         cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
         if cursor.fetchone():
-            conn.close()
             return jsonify({'error': 'Email already exists'}), 409
         
         # Create the user with the new fields
@@ -521,8 +1019,6 @@ def register():
         conn.commit()
         user_id = cursor.lastrowid
         
-        conn.close()
-        
         return jsonify({
             'id': user_id,
             'username': username,
@@ -557,8 +1053,6 @@ def login():
         cursor.execute("SELECT * FROM users WHERE username = %s", (username,))
         user = cursor.fetchone()
         
-        conn.close()
-        
         if not user or user['password_hash'] != password_hash:
             return jsonify({'error': 'Invalid username or password'}), 401
         
@@ -577,46 +1071,36 @@ def login():
         return jsonify({'error': str(e)}), 500
 
 # Food information endpoints
+# These serve reference data from reference_data, tagged with an ETag so
+# clients can revalidate with If-None-Match and get an empty 304 back.
+def reference_response(payload):
+    etag = reference_data.etag()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/api/food-categories', methods=['GET'])
 def get_food_categories():
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("SELECT * FROM food_categories")
-        categories = cursor.fetchall()
-        
-        conn.close()
-        
-        # Convert datetime objects to strings for JSON serialization
-        for category in categories:
-            if category.get('created_at'):
-                category['created_at'] = category['created_at'].isoformat()
-        
-        return jsonify(categories), 200
+        return reference_response(reference_data.categories())
         
     except Exception as e:
-        print(f"Error in get_food_categories: {str(e)}")  # Debug print
+        log.exception("Error in get_food_categories")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/food-categories/<int:category_id>', methods=['GET'])
 def get_food_category(category_id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("SELECT * FROM food_categories WHERE id = %s", (category_id,))
-        category = cursor.fetchone()
-        
-        conn.close()
+        category = reference_data.category(category_id)
         
         if category is None:
             return jsonify({'error': 'Category not found'}), 404
             
-        if category.get('created_at'):
-            category['created_at'] = category['created_at'].isoformat()
-            
-        return jsonify(category), 200
+        return reference_response(category)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -624,36 +1108,22 @@ def get_food_category(category_id):
 @app.route('/api/food-info/<int:category_id>', methods=['GET'])
 def get_food_info(category_id):
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        cursor.execute("""
-            SELECT 
-                fc.id,
-                fc.name,
-                fc.description,
-                fi.calories,
-                fi.protein,
-                fi.carbs,
-                fi.fats,
-                fi.description as nutritional_info,
-                fi.cultural_info
-            FROM food_categories fc
-            LEFT JOIN food_info fi ON fc.id = fi.food_category_id
-            WHERE fc.id = %s
-        """, (category_id,))
-        
-        food_info = cursor.fetchone()
-        conn.close()
+        food_info = reference_data.food_info(category_id)
         
         if food_info is None:
             return jsonify({'error': 'Food information not found'}), 404
             
-        return jsonify(food_info), 200
+        return reference_response(food_info)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Call after changing food_categories, food_info or ingredients in MySQL
+@app.route('/api/reference-data/invalidate', methods=['POST'])
+def invalidate_reference_data():
+    reference_data.invalidate()
+    return jsonify({'message': 'Reference data cache cleared'}), 200
+
 @app.route('/api/users/update', methods=['PUT'])
 def update_user():
     try:
@@ -683,7 +1153,6 @@ def update_user():
         # Get updated user data
         cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
         user = cursor.fetchone()
-        conn.close()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -702,10 +1171,79 @@ def update_user():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/users/<int:user_id>/summary', methods=['GET'])
+def get_user_summary(user_id):
+    """
+    Daily nutrition totals between ?from= and ?to= (YYYY-MM-DD, inclusive),
+    read from the pre-aggregated user_daily_summaries table. Defaults to the
+    last 7 days.
+    """
+    try:
+        try:
+            end = daily_summary.parse_day(request.args.get('to'), datetime.now().date())
+            start = daily_summary.parse_day(request.args.get('from'), end - timedelta(days=6))
+        except ValueError:
+            return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+        if start > end:
+            return jsonify({'error': '"from" must not be after "to"'}), 400
+        if (end - start).days >= SUMMARY_MAX_DAYS:
+            return jsonify({'error': f'At most {SUMMARY_MAX_DAYS} days per request'}), 400
+        
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        days = daily_summary.fetch_summary(cursor, user_id, start, end)
+        cursor.close()
+        
+        totals = {field: round(sum(day[field] for day in days), 2) for field in daily_summary.NUTRIENTS}
+        totals['meal_count'] = sum(day['meal_count'] for day in days)
+        
+        return jsonify({
+            'user_id': user_id,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'days': days,
+            'totals': totals
+        }), 200
+        
+    except Exception as e:
+        log.exception("Error in get_user_summary")
+        return jsonify({'error': str(e)}), 500
+
 # Add a route for serving temporary images
 @app.route('/temp_image/<path:filename>', methods=['GET'])
 def temp_image(filename):
     return send_from_directory('uploads', filename)
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    return jsonify({'status': 'ok'}), 200
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """
+    200 once this process has its models loaded and warmed up, 503 until
+    then; includes the loading state, any load error and the load and
+    warm-up timings
+    """
+    ready = model_registry.ready
+    return jsonify({
+        'ready': ready,
+        'backend': MODEL_BACKEND,
+        'loading': MODEL_LOADING,
+        'model_version': MODEL_VERSION,
+        **model_registry.status()
+    }), 200 if ready else 503
+
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5001, debug=True)  # Added debug=True for better error messages
\ No newline at end of file
+    # Development server only; use `gunicorn -c gunicorn.conf.py` in production.
+    # The reloader would import (and load TensorFlow) a second time, so it stays off.
+    app.run(
+        host='0.0.0.0',
+        port=int(os.environ.get('FDDC_PORT', '5001')),
+        debug=os.environ.get('FDDC_DEBUG', '0') == '1',
+        use_reloader=False
+    )
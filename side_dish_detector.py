@@ -0,0 +1,193 @@
+import json
+import logging
+import os
+
+import numpy as np
+from PIL import Image
+
+from image_pipeline import decode_image, image_size
+from model_backends import OnnxBackend, TFLiteBackend
+
+# Local replacement for the Roboflow side dish detector. Runs an exported
+# YOLOv8-style detector (.onnx with ONNX Runtime, or .tflite) on the CPU and
+# returns detections in the same shape as RoboflowClient.detect. Download
+# the Roboflow model's weights, export them with e.g.
+# `yolo export model=best.pt format=onnx`, and point FDDC_DETECTOR_MODEL at
+# the file.
+
+# Classes of the Roboflow side dish model, in its (alphabetical) class order.
+# A detector trained on other classes needs a JSON list of its class names in
+# FDDC_DETECTOR_CLASSES.
+DEFAULT_CLASSES = [
+    "Anchovies", "Boiled-Egg", "Chicken Rendang", "Cucumber",
+    "Fried-Chicken", "Fried-Egg", "Peanuts", "Rice", "Sambal"
+]
+
+# Letterbox padding colour used by YOLO exports
+PAD_VALUE = 114
+
+log = logging.getLogger(__name__)
+
+
+class DetectorError(Exception):
+    pass
+
+
+def letterbox(img, size):
+    """
+    Resize a PIL image to fit size x size keeping its aspect ratio, padded
+    to a square. Returns (float32 HWC array in [0, 1], scale, (pad_x, pad_y)).
+    """
+    width, height = img.size
+    scale = min(size / width, size / height)
+    new_width, new_height = max(1, round(width * scale)), max(1, round(height * scale))
+    pad_x, pad_y = (size - new_width) // 2, (size - new_height) // 2
+    canvas = Image.new('RGB', (size, size), (PAD_VALUE,) * 3)
+    canvas.paste(img.resize((new_width, new_height), Image.BILINEAR), (pad_x, pad_y))
+    array = np.asarray(canvas, dtype=np.float32)
+    array *= 1.0 / 255.0
+    return array, scale, (pad_x, pad_y)
+
+
+def box_iou(box, boxes):
+    """
+    IoU of one (x1, y1, x2, y2) box with each row of boxes
+    """
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    intersection = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    return intersection / np.maximum(area + areas - intersection, 1e-9)
+
+
+def non_max_suppression(boxes, scores, class_ids, iou_threshold, max_detections=100):
+    """
+    Per-class greedy NMS. Boxes of different classes are shifted apart so
+    one pass never lets them suppress each other; each step drops every
+    remaining box overlapping the current best one at once.
+    Returns the indices kept, best first.
+    """
+    if not len(boxes):
+        return np.empty(0, dtype=np.int64)
+    offsets = class_ids[:, np.newaxis] * (boxes.max() + 1)
+    shifted = boxes + offsets
+    order = np.argsort(-scores)
+    keep = []
+    while len(order) and len(keep) < max_detections:
+        best = order[0]
+        keep.append(best)
+        order = order[1:][box_iou(shifted[best], shifted[order[1:]]) <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def load_class_names(path):
+    if not path:
+        return DEFAULT_CLASSES
+    with open(path) as f:
+        return json.load(f)
+
+
+class SideDishDetector:
+    """
+    CPU object detector for side dishes. confidence and iou match the
+    Roboflow hosted API's confidence/overlap parameters (as fractions).
+    """
+
+    def __init__(self, model_path, class_names=None, confidence=0.4, iou=0.3, num_threads=None):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Detector model {model_path} not found")
+        if model_path.endswith(".onnx"):
+            self.backend = OnnxBackend(model_path, num_threads=num_threads)
+        elif model_path.endswith(".tflite"):
+            self.backend = TFLiteBackend(model_path, num_threads=num_threads)
+        else:
+            raise ValueError(f"Unsupported detector model {model_path}, expected .onnx or .tflite")
+        self.model_path = model_path
+        self.class_names = list(class_names or DEFAULT_CLASSES)
+        self.confidence = confidence
+        self.iou = iou
+
+        # YOLO ONNX exports are NCHW, TFLite exports NHWC
+        shape = self.backend.input_shape
+        self.channels_first = shape[1] == 3
+        size = shape[2] if self.channels_first else shape[1]
+        self.input_size = int(size) if isinstance(size, (int, np.integer)) and size > 0 else 640
+
+    def _predict(self, array):
+        batch = array[np.newaxis]
+        if self.channels_first:
+            batch = batch.transpose(0, 3, 1, 2)
+        output = self.backend.predict(batch)
+        if isinstance(output, list):
+            output = output[0]
+        output = np.asarray(output)[0]
+        # (4 + classes, anchors) for YOLOv8 exports; accept the transpose too
+        if output.shape[0] == 4 + len(self.class_names):
+            output = output.T
+        if output.shape[1] != 4 + len(self.class_names):
+            raise DetectorError(f"Unexpected detector output shape {output.shape} "
+                                f"for {len(self.class_names)} classes")
+        return output
+
+    def detect_arrays(self, img):
+        """
+        Detections for a PIL image as arrays: (boxes as x1, y1, x2, y2 in
+        image pixels, confidences between 0 and 1, class ids), best first
+        """
+        array, scale, (pad_x, pad_y) = letterbox(img, self.input_size)
+        output = self._predict(array)
+
+        class_scores = output[:, 4:]
+        class_ids = np.argmax(class_scores, axis=1)
+        scores = class_scores[np.arange(len(class_scores)), class_ids]
+        mask = scores >= self.confidence
+        centers, scores, class_ids = output[mask, :4], scores[mask], class_ids[mask]
+
+        # Centre/size in letterboxed input pixels -> corners in image pixels
+        half = centers[:, 2:4] / 2
+        boxes = np.concatenate([centers[:, :2] - half, centers[:, :2] + half], axis=1)
+        if len(boxes) and boxes.max() <= 1.5:
+            # Some exports emit coordinates normalised to the input size
+            boxes *= self.input_size
+        boxes -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+        boxes /= scale
+        boxes = np.clip(boxes, 0, np.array([*img.size, *img.size], dtype=np.float32))
+
+        keep = non_max_suppression(boxes, scores, class_ids, self.iou)
+        return boxes[keep], scores[keep], class_ids[keep]
+
+    def detect(self, image_bytes):
+        """
+        Return [{'name', 'confidence', 'x', 'y', 'width', 'height'}] sorted
+        by confidence (in percent), like RoboflowClient.detect, or raise
+        DetectorError. Boxes are centre and size in pixels of the upload.
+        """
+        try:
+            img, _ = decode_image(image_bytes, (self.input_size, self.input_size))
+            # A draft-mode JPEG decode may be smaller than the upload
+            original_size = image_size(image_bytes)
+            boxes, scores, class_ids = self.detect_arrays(img)
+        except DetectorError:
+            raise
+        except Exception as e:
+            raise DetectorError(f"detection failed: {e}")
+        boxes = boxes * (original_size[0] / img.size[0])
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        sizes = boxes[:, 2:] - boxes[:, :2]
+        return [
+            {
+                'name': self.class_names[class_id],
+                'confidence': round(float(score) * 100, 2),
+                'x': round(float(center[0]), 1),
+                'y': round(float(center[1]), 1),
+                'width': round(float(size[0]), 1),
+                'height': round(float(size[1]), 1),
+            }
+            for score, class_id, center, size in zip(scores, class_ids, centers, sizes)
+        ]
+
+    def warm_up(self):
+        self._predict(np.zeros((self.input_size, self.input_size, 3), dtype=np.float32))
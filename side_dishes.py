@@ -0,0 +1,132 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+# The nasi lemak side dishes the local classifier knows about, in the order
+# of its sigmoid outputs, with the dataset folder each one is trained from.
+# The model is multi-label: every output is an independent "is this on the
+# plate" probability, compared against its own threshold calibrated on the
+# validation set by train_side_dishes_model.py.
+
+CLASSES = [
+    ('ikan_bilis', "Ikan Bilis"),
+    ('telur', "Telur"),
+    ('sambal', "Sambal"),
+    ('timun', "Timun"),
+    ('kacang', "Kacang"),
+]
+FOLDERS = [folder for folder, _ in CLASSES]
+LABELS = [label for _, label in CLASSES]
+
+# Used for any class without a calibrated threshold (and by the old single
+# output Ikan Bilis model)
+DEFAULT_THRESHOLD = 0.3
+
+THRESHOLDS_PATH = "nasi_lemak_side_dishes_thresholds.json"
+
+# Optional per-split label file: a path column relative to the split
+# directory plus one 0/1 column per folder name
+LABELS_FILE = "labels.csv"
+
+log = logging.getLogger(__name__)
+
+
+def _file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_split(directory):
+    """
+    Image paths and multi-hot label rows (float32, one column per CLASSES
+    entry) for a dataset split. Uses directory/labels.csv when present.
+    Otherwise each <folder>/ marks its images as containing that side dish,
+    and a photo saved in several folders (same content) gets all of them.
+    Returns (paths, labels)
+    """
+    labels_path = os.path.join(directory, LABELS_FILE)
+    if os.path.exists(labels_path):
+        paths, rows = [], []
+        with open(labels_path, newline='') as f:
+            for row in csv.DictReader(f):
+                paths.append(os.path.join(directory, row['path']))
+                rows.append([float(row.get(folder) or 0) for folder in FOLDERS])
+        return paths, np.array(rows, dtype=np.float32).reshape(-1, len(FOLDERS))
+
+    by_hash = {}
+    for index, folder in enumerate(FOLDERS):
+        folder_dir = os.path.join(directory, folder)
+        if not os.path.isdir(folder_dir):
+            continue
+        for file_name in sorted(os.listdir(folder_dir)):
+            if not file_name.lower().endswith((".jpg", ".jpeg", ".png", ".bmp", ".gif")):
+                continue
+            path = os.path.join(folder_dir, file_name)
+            entry = by_hash.setdefault(_file_hash(path), [path, np.zeros(len(FOLDERS), dtype=np.float32)])
+            entry[1][index] = 1.0
+    if not by_hash:
+        raise ValueError(f"No side dish images found under {directory}")
+    paths = [path for path, _ in by_hash.values()]
+    return paths, np.stack([row for _, row in by_hash.values()])
+
+
+def load_thresholds(path=THRESHOLDS_PATH):
+    """
+    Per-label thresholds written by train_side_dishes_model.py, or {} when
+    the model hasn't been calibrated
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)['thresholds']
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, KeyError) as e:
+        log.warning("Ignoring side dish thresholds in %s: %s", path, e)
+        return {}
+
+
+def calibrate_thresholds(scores, labels, candidates=np.linspace(0.05, 0.95, 19)):
+    """
+    For each label, the threshold with the best F1 on (scores, labels).
+    Labels with no positive examples keep DEFAULT_THRESHOLD.
+    Returns ({label: threshold}, {label: f1})
+    """
+    thresholds, f1_scores = {}, {}
+    for index, label in enumerate(LABELS[:scores.shape[1]]):
+        positives = labels[:, index] > 0.5
+        if not positives.any():
+            thresholds[label] = DEFAULT_THRESHOLD
+            continue
+        # Every candidate at once: (candidates, images)
+        predicted = scores[:, index][np.newaxis, :] >= candidates[:, np.newaxis]
+        true_pos = (predicted & positives).sum(axis=1)
+        precision = true_pos / np.maximum(predicted.sum(axis=1), 1)
+        recall = true_pos / positives.sum()
+        f1 = 2 * precision * recall / np.maximum(precision + recall, 1e-9)
+        best = int(np.argmax(f1))
+        thresholds[label] = round(float(candidates[best]), 3)
+        f1_scores[label] = round(float(f1[best]), 4)
+    return thresholds, f1_scores
+
+
+def decode(prediction, thresholds):
+    """
+    Side dishes present in one image's model output (a row of per-label
+    probabilities; an old single-output model covers Ikan Bilis only)
+    Returns (detected [{'name', 'confidence' (percent)}] most confident
+    first, {label: confidence percent} for every label)
+    """
+    scores = np.asarray(prediction, dtype=np.float32).reshape(-1)
+    all_predictions = {}
+    detected = []
+    for label, score in zip(LABELS, scores):
+        confidence = round(float(score) * 100, 2)
+        all_predictions[label] = confidence
+        if score > thresholds.get(label, DEFAULT_THRESHOLD):
+            detected.append({'name': label, 'confidence': confidence})
+    detected.sort(key=lambda side_dish: side_dish['confidence'], reverse=True)
+    return detected, all_predictions
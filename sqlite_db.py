@@ -0,0 +1,222 @@
+import re
+import sqlite3
+from datetime import date, datetime
+
+# SQLite stand-in for the MySQL database, for load testing and local runs
+# without a MySQL server. db_pool uses it when FDDC_DB_BACKEND=sqlite.
+# Connections mimic the parts of mysql-connector the server uses:
+# %s placeholders, cursor(dictionary=True), lastrowid and in_transaction.
+# The few MySQL-only constructs in the server's queries are rewritten on
+# the fly (see translate).
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    email TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    password_hash TEXT NOT NULL,
+    full_name TEXT,
+    weight REAL,
+    height REAL,
+    gender TEXT,
+    activity_level TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS food_categories (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL COLLATE NOCASE,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS food_info (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    food_category_id INTEGER NOT NULL REFERENCES food_categories(id),
+    calories REAL,
+    protein REAL,
+    carbs REAL,
+    fats REAL,
+    description TEXT,
+    cultural_info TEXT
+);
+
+CREATE TABLE IF NOT EXISTS ingredients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL COLLATE NOCASE
+);
+
+CREATE TABLE IF NOT EXISTS food_predictions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    food_category_id INTEGER NOT NULL,
+    confidence REAL,
+    image_path TEXT,
+    created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+);
+
+CREATE TABLE IF NOT EXISTS prediction_ingredients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    prediction_id INTEGER NOT NULL,
+    ingredient_id INTEGER NOT NULL,
+    confidence REAL
+);
+
+CREATE TABLE IF NOT EXISTS user_daily_summaries (
+    user_id INTEGER NOT NULL,
+    day DATE NOT NULL,
+    calories REAL NOT NULL DEFAULT 0,
+    protein REAL NOT NULL DEFAULT 0,
+    carbs REAL NOT NULL DEFAULT 0,
+    fats REAL NOT NULL DEFAULT 0,
+    meal_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+    PRIMARY KEY (user_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_food_predictions_user_history
+    ON food_predictions (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_prediction_ingredients_prediction
+    ON prediction_ingredients (prediction_id, confidence);
+"""
+
+# Reference rows matching the classifier labels and Roboflow classes
+SEED_CATEGORIES = [
+    ('cendol', 'Shaved ice dessert with green rice flour jelly, coconut milk and palm sugar', 380, 4.0, 64.0, 13.0),
+    ('ketupat', 'Compressed rice cake boiled in a woven palm leaf pouch', 200, 4.0, 44.0, 0.5),
+    ('laksa', 'Spicy noodle soup with a fish or coconut curry broth', 430, 19.0, 52.0, 16.0),
+    ('nasi ayam', 'Fragrant chicken rice served with chili sauce', 450, 25.0, 45.0, 12.0),
+    ('nasi lemak', 'Rice cooked in coconut milk with sambal, anchovies, peanuts and egg', 650, 18.0, 80.0, 28.0),
+]
+SEED_INGREDIENTS = ['Ikan Bilis', 'Anchovies', 'Boiled-Egg', 'Sambal', 'Cucumber', 'Peanuts', 'Telur', 'Timun', 'Kacang']
+
+
+def _adapt_datetime(value):
+    return value.isoformat(' ')
+
+
+def _convert_timestamp(value):
+    return datetime.fromisoformat(value.decode())
+
+
+def _convert_date(value):
+    return date.fromisoformat(value.decode())
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+sqlite3.register_converter("DATE", _convert_date)
+
+_VALUES_FN = re.compile(r"VALUES\((\w+)\)", re.IGNORECASE)
+
+
+def translate(sql):
+    """
+    Rewrite the MySQL dialect used by the server's queries for SQLite
+    """
+    sql = sql.replace("%s", "?")
+    sql = re.sub(r"CURDATE\(\)", "date('now', 'localtime')", sql, flags=re.IGNORECASE)
+    sql = re.sub(r"\bNOW\(\)", "datetime('now', 'localtime')", sql, flags=re.IGNORECASE)
+    if re.search(r"ON DUPLICATE KEY UPDATE", sql, re.IGNORECASE):
+        head, updates = re.split(r"ON DUPLICATE KEY UPDATE", sql, maxsplit=1, flags=re.IGNORECASE)
+        sql = head + "ON CONFLICT DO UPDATE SET" + _VALUES_FN.sub(r"excluded.\1", updates)
+    return sql
+
+
+class Cursor:
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(translate(sql), tuple(params or ()))
+
+    def executemany(self, sql, rows):
+        self._cursor.executemany(translate(sql), [tuple(row) for row in rows])
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return self._convert(row) if row is not None else None
+
+    def fetchall(self):
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+    def _convert(self, row):
+        if not self._dictionary:
+            return tuple(row)
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+
+class Connection:
+    def __init__(self, path, timeout=5.0):
+        self._conn = sqlite3.connect(
+            path,
+            timeout=timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def cursor(self, dictionary=False):
+        return Cursor(self._conn.cursor(), dictionary)
+
+    @property
+    def in_transaction(self):
+        return self._conn.in_transaction
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def connect(path, timeout=5.0):
+    return Connection(path, timeout)
+
+
+def init_db(path, seed=True):
+    """
+    Create the schema (idempotently) and, with seed, the reference data
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    if seed and conn.execute("SELECT COUNT(*) FROM food_categories").fetchone()[0] == 0:
+        for name, description, calories, protein, carbs, fats in SEED_CATEGORIES:
+            category_id = conn.execute(
+                "INSERT INTO food_categories (name, description) VALUES (?, ?)", (name, description)
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO food_info (food_category_id, calories, protein, carbs, fats, description) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (category_id, calories, protein, carbs, fats, description)
+            )
+        conn.executemany("INSERT INTO ingredients (name) VALUES (?)", [(name,) for name in SEED_INGREDIENTS])
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create a seeded SQLite stand-in database")
+    parser.add_argument("path", nargs="?", default="fddc_standin.db")
+    args = parser.parse_args()
+    init_db(args.path)
+    print(f"✅ SQLite stand-in ready at {args.path}")
@@ -8,8 +8,10 @@ from tensorflow.keras.preprocessing import image
 # Load the trained model
 model = tf.keras.models.load_model("nasi_lemak_side_dishes_model.keras")
 
-# Define side dish label
-class_label = "Ikan Bilis"  # Currently only detecting one class
+import side_dishes
+
+# Per side dish thresholds from training (defaults when not calibrated)
+thresholds = side_dishes.load_thresholds()
 
 def predict_side_dish(img_path):
     # Load and preprocess the image
@@ -18,25 +20,17 @@ def predict_side_dish(img_path):
     img_array = np.expand_dims(img_array, axis=0)
     img_array = img_array / 255.0
 
-    # Make prediction
+    # Make prediction: one probability per side dish
     prediction = model.predict(img_array)
-    
-    # Get confidence score (probability of the class being present)
-    confidence = float(prediction[0][0] * 100)
-    
-    # Determine if the side dish is present (using 0.5 threshold)
-    is_present = prediction[0][0] > 0.5
-    
-    if is_present:
-        print(f"\n✅ Detected {class_label} with {confidence:.2f}% confidence")
-    else:
-        print(f"\n❌ {class_label} not detected (confidence: {confidence:.2f}%)")
-    
-    return {
-        'name': class_label,
-        'confidence': confidence,
-        'is_present': is_present
-    }
+    detected, all_predictions = side_dishes.decode(prediction[0], thresholds)
+
+    for label, confidence in all_predictions.items():
+        if any(side_dish['name'] == label for side_dish in detected):
+            print(f"✅ Detected {label} with {confidence:.2f}% confidence")
+        else:
+            print(f"❌ {label} not detected (confidence: {confidence:.2f}%)")
+
+    return detected
 
 if __name__ == "__main__":
     # Test with a sample image
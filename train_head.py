@@ -0,0 +1,146 @@
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import argparse
+import json
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D, Input
+from tensorflow.keras.models import Model
+
+import feature_cache
+import side_dishes
+import training_data
+
+# Fast retraining of a classifier head on cached backbone features (see
+# feature_cache.py). The head is the same Dense(128) -> Dropout -> Dense(k)
+# the training scripts build; once trained it is put back on a frozen
+# MobileNetV2 and saved as a full model the server loads like any other.
+# The cached features are of unaugmented images, so train_model.py and
+# train_side_dishes_model.py remain the way to train with augmentation.
+#
+#   python train_head.py --model main
+
+MODELS = {
+    'main': {
+        'train_dir': "dataset/train",
+        'val_dir': "dataset/validation",
+        'label_mode': 'categorical',
+        'epochs': 30,
+        'output': "food_classification_model.keras",
+    },
+    'side': {
+        'train_dir': "dataset_side_dishes/train",
+        'val_dir': "dataset_side_dishes/validation",
+        'label_mode': 'multi_label',
+        'epochs': 30,
+        'output': "nasi_lemak_side_dishes_model.keras",
+    },
+}
+
+
+def load_split(directory, label_mode):
+    """
+    (features, encoded labels, class names) for one dataset split.
+    multi_label splits use the side dish labels (see side_dishes.load_split).
+    """
+    if label_mode == 'multi_label':
+        paths, labels = side_dishes.load_split(directory)
+        return feature_cache.feature_rows(directory, paths), labels, side_dishes.LABELS
+    features, labels, class_names = feature_cache.load_features(directory)
+    if label_mode == 'categorical':
+        return features, tf.keras.utils.to_categorical(labels, len(class_names)), class_names
+    return features, labels.astype(np.float32).reshape(-1, 1), class_names
+
+
+def build_head(num_classes, label_mode):
+    """
+    The training scripts' classifier head, taking pooled features as input
+    """
+    features = Input(shape=(feature_cache.FEATURE_DIM,), name="pooled_features")
+    x = Dense(128, activation="relu")(features)
+    x = Dropout(0.5)(x)
+    if label_mode == 'categorical':
+        x = Dense(num_classes, activation="softmax")(x)
+    elif label_mode == 'multi_label':
+        x = Dense(num_classes, activation="sigmoid")(x)
+    else:
+        x = Dense(1, activation="sigmoid")(x)
+    return Model(inputs=features, outputs=x, name="head")
+
+
+def attach_backbone(head, img_size=training_data.IMG_SIZE):
+    """
+    Full image classifier: frozen ImageNet MobileNetV2, global average
+    pooling and the trained head layers, laid out like the training scripts'
+    models so export_multihead_model.py and convert_to_tflite.py work on it
+    """
+    base_model = tf.keras.applications.MobileNetV2(
+        input_shape=(*img_size, 3), include_top=False, weights="imagenet"
+    )
+    base_model.trainable = False
+    x = GlobalAveragePooling2D()(base_model.output)
+    for layer in head.layers[1:]:
+        x = layer(x)
+    return Model(inputs=base_model.input, outputs=x)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a classifier head on cached backbone features")
+    parser.add_argument("--model", choices=sorted(MODELS), default='main')
+    parser.add_argument("--train-dir")
+    parser.add_argument("--val-dir")
+    parser.add_argument("--epochs", type=int)
+    parser.add_argument("--batch-size", type=int, default=training_data.BATCH_SIZE)
+    parser.add_argument("--output", help="where to save the full model")
+    args = parser.parse_args()
+
+    settings = dict(MODELS[args.model])
+    for key in ('train_dir', 'val_dir', 'epochs', 'output'):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+    label_mode = settings['label_mode']
+
+    start = time.perf_counter()
+    train_features, train_labels, class_names = load_split(settings['train_dir'], label_mode)
+    val_features, val_labels, val_class_names = load_split(settings['val_dir'], label_mode)
+    if val_class_names != class_names:
+        raise SystemExit(f"❌ Validation classes {val_class_names} differ from training classes {class_names}")
+    print(f"🔄 Features ready in {time.perf_counter() - start:.1f}s "
+          f"({len(train_labels)} training, {len(val_labels)} validation images)")
+    print(f"Detected classes: {class_names}")
+
+    head = build_head(len(class_names), label_mode)
+    head.compile(
+        optimizer="adam",
+        loss="categorical_crossentropy" if label_mode == 'categorical' else "binary_crossentropy",
+        metrics=["accuracy"]
+    )
+
+    start = time.perf_counter()
+    head.fit(
+        np.asarray(train_features),
+        train_labels,
+        validation_data=(np.asarray(val_features), val_labels),
+        epochs=settings['epochs'],
+        batch_size=args.batch_size,
+        shuffle=True,
+        verbose=2
+    )
+    print(f"⏱️ Head trained in {time.perf_counter() - start:.1f}s")
+
+    model = attach_backbone(head)
+    model.save(settings['output'])
+    print(f"✅ Model saved as '{settings['output']}'")
+
+    if label_mode == 'multi_label':
+        thresholds, f1_scores = side_dishes.calibrate_thresholds(head.predict(np.asarray(val_features)), val_labels)
+        with open(side_dishes.THRESHOLDS_PATH, "w") as f:
+            json.dump({'labels': side_dishes.LABELS, 'thresholds': thresholds, 'validation_f1': f1_scores}, f, indent=2)
+        print(f"✅ Thresholds {thresholds} saved as '{side_dishes.THRESHOLDS_PATH}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
 import tensorflow as tf
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
 from tensorflow.keras.models import Model
-import os
+
+from training_data import EpochTimer, make_dataset
 
 # ✅ Dataset paths
 train_dir = "dataset/train"
@@ -14,42 +14,27 @@ IMG_SIZE = (224, 224)
 BATCH_SIZE = 32
 
 # ✅ Load and preprocess images
-
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
-
-train_datagen = ImageDataGenerator(
-    rescale=1.0/255,
-    rotation_range=40,  # Increase rotation range
-    width_shift_range=0.3,
-    height_shift_range=0.3,
-    shear_range=0.3,
-    zoom_range=0.3,
-    horizontal_flip=True,
-   
-)
-
-
-val_datagen = ImageDataGenerator(rescale=1.0/255)
-
-train_datagen = ImageDataGenerator(rescale=1.0/255)
-val_datagen = ImageDataGenerator(rescale=1.0/255)
-
-train_generator = train_datagen.flow_from_directory(
+# Decoded images are cached to disk after the first epoch; augmentation runs
+# on each batch afterwards, so every epoch still sees different variations
+train_ds, class_names = make_dataset(
     train_dir,
-    target_size=IMG_SIZE,
+    label_mode='categorical',
     batch_size=BATCH_SIZE,
-    class_mode='categorical'
+    img_size=IMG_SIZE,
+    augment=True,
+    cache='file'
 )
 
-val_generator = val_datagen.flow_from_directory(
+val_ds, _ = make_dataset(
     val_dir,
-    target_size=IMG_SIZE,
+    label_mode='categorical',
     batch_size=BATCH_SIZE,
-    class_mode='categorical'
+    img_size=IMG_SIZE,
+    shuffle=False,
+    cache=True
 )
 
 # ✅ Get class names (for later prediction)
-class_names = list(train_generator.class_indices.keys())
 print(f"Detected classes: {class_names}")
 
 
@@ -80,9 +65,10 @@ model.summary()
 EPOCHS = 10
 
 history = model.fit(
-    train_generator,
-    validation_data=val_generator,
-    epochs=EPOCHS
+    train_ds,
+    validation_data=val_ds,
+    epochs=EPOCHS,
+    callbacks=[EpochTimer()]
 )
 
 # ✅ Save the trained model
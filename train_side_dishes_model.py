@@ -1,9 +1,13 @@
+import json
+
+import numpy as np
 import tensorflow as tf
-from tensorflow.keras.preprocessing.image import ImageDataGenerator
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.layers import Dense, Dropout, GlobalAveragePooling2D
 from tensorflow.keras.models import Model
-import os
+
+import side_dishes
+from training_data import EpochTimer, dataset_from_files
 
 # Dataset paths for side dishes
 train_dir = "dataset_side_dishes/train"
@@ -13,40 +17,35 @@ val_dir = "dataset_side_dishes/validation"
 IMG_SIZE = (224, 224)
 BATCH_SIZE = 32
 
-# Data augmentation for training
-train_datagen = ImageDataGenerator(
-    rescale=1.0/255,
-    rotation_range=40,
-    width_shift_range=0.3,
-    height_shift_range=0.3,
-    shear_range=0.3,
-    zoom_range=0.3,
-    horizontal_flip=True,
-)
-
-# Validation data only needs rescaling
-val_datagen = ImageDataGenerator(rescale=1.0/255)
+# Multi-hot labels, one column per side dish: from labels.csv, or from the
+# side dish folders (ikan_bilis/, telur/, sambal/, timun/, kacang/)
+train_paths, train_labels = side_dishes.load_split(train_dir)
+val_paths, val_labels = side_dishes.load_split(val_dir)
 
-# Set up data generators for binary classification
-train_generator = train_datagen.flow_from_directory(
-    train_dir,
-    target_size=IMG_SIZE,
+# Augmented training data, decoded images cached to disk after the first epoch
+train_ds = dataset_from_files(
+    train_paths,
+    train_labels,
     batch_size=BATCH_SIZE,
-    class_mode='binary',  # Changed to binary
-    shuffle=True
+    img_size=IMG_SIZE,
+    augment=True,
+    cache='file',
+    cache_name=train_dir
 )
 
-val_generator = val_datagen.flow_from_directory(
-    val_dir,
-    target_size=IMG_SIZE,
+# Validation data is only decoded and rescaled
+val_ds = dataset_from_files(
+    val_paths,
+    val_labels,
     batch_size=BATCH_SIZE,
-    class_mode='binary',  # Changed to binary
-    shuffle=True
+    img_size=IMG_SIZE,
+    shuffle=False,
+    cache=True
 )
 
-# Get class names (side dishes)
-class_names = list(train_generator.class_indices.keys())
-print(f"Detected side dishes: {class_names}")
+# Training images per side dish
+for label, count in zip(side_dishes.LABELS, train_labels.sum(axis=0)):
+    print(f"{label}: {int(count)} training images")
 
 # Load MobileNetV2 as base model
 base_model = MobileNetV2(input_shape=(224, 224, 3), include_top=False, weights="imagenet")
@@ -57,7 +56,7 @@ x = base_model.output
 x = GlobalAveragePooling2D()(x)
 x = Dense(128, activation="relu")(x)
 x = Dropout(0.5)(x)
-x = Dense(1, activation="sigmoid")(x)  # Changed to single output with sigmoid
+x = Dense(len(side_dishes.LABELS), activation="sigmoid")(x)  # One independent sigmoid per side dish
 
 # Create final model
 model = Model(inputs=base_model.input, outputs=x)
@@ -65,8 +64,8 @@ model = Model(inputs=base_model.input, outputs=x)
 # Compile the model
 model.compile(
     optimizer="adam",
-    loss="binary_crossentropy",  # Changed to binary crossentropy
-    metrics=["accuracy"]
+    loss="binary_crossentropy",
+    metrics=[tf.keras.metrics.BinaryAccuracy(name="accuracy"), tf.keras.metrics.AUC(multi_label=True, name="auc")]
 )
 
 # Display model summary
@@ -76,12 +75,30 @@ model.summary()
 EPOCHS = 15
 
 history = model.fit(
-    train_generator,
-    validation_data=val_generator,
-    epochs=EPOCHS
+    train_ds,
+    validation_data=val_ds,
+    epochs=EPOCHS,
+    callbacks=[EpochTimer()]
 )
 
 # Save the trained model
 model.save("nasi_lemak_side_dishes_model.keras")
 
-print("✅ Training complete! Model saved as 'nasi_lemak_side_dishes_model.keras'.")
\ No newline at end of file
+# Calibrate a threshold per side dish on the validation set
+val_scores = model.predict(val_ds)
+thresholds, f1_scores = side_dishes.calibrate_thresholds(val_scores, val_labels)
+with open(side_dishes.THRESHOLDS_PATH, "w") as f:
+    json.dump({
+        'labels': side_dishes.LABELS,
+        'thresholds': thresholds,
+        'validation_f1': f1_scores,
+        'validation_positives': dict(zip(side_dishes.LABELS, np.sum(val_labels, axis=0).astype(int).tolist())),
+    }, f, indent=2)
+
+for label in side_dishes.LABELS:
+    f1 = f1_scores.get(label)
+    print(f"{label}: threshold {thresholds[label]}" + (f", validation F1 {f1:.3f}" if f1 is not None else
+                                                       " (no validation examples, default)"))
+
+print("✅ Training complete! Model saved as 'nasi_lemak_side_dishes_model.keras', "
+      f"thresholds in '{side_dishes.THRESHOLDS_PATH}'.")
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+
+# Shared tf.data input pipeline for the training scripts. Images are decoded
+# and resized in parallel by TensorFlow (not in Python), optionally cached
+# decoded so later epochs skip JPEG decoding, augmented a whole batch at a
+# time with Keras preprocessing layers, and prefetched so the next batch is
+# ready while the model trains on the current one.
+
+IMG_SIZE = (224, 224)
+BATCH_SIZE = 32
+AUTOTUNE = tf.data.AUTOTUNE
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif")
+
+# Decoded-image caches (see make_dataset's cache argument) go here
+CACHE_DIR = ".tfdata_cache"
+
+
+def list_image_files(directory):
+    """
+    Image paths under directory/<class>/ with their class indices, classes in
+    the same alphanumeric order flow_from_directory uses
+    Returns (paths, labels, class_names)
+    """
+    class_names = sorted(
+        name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name))
+    )
+    paths, labels = [], []
+    for label, class_name in enumerate(class_names):
+        class_dir = os.path.join(directory, class_name)
+        for file_name in sorted(os.listdir(class_dir)):
+            if file_name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(class_dir, file_name))
+                labels.append(label)
+    if not paths:
+        raise ValueError(f"No images found under {directory}")
+    return paths, labels, class_names
+
+
+def augmentation_layers(seed=None):
+    """
+    Batch-level equivalent of the ImageDataGenerator settings the training
+    scripts used (rotation 40°, shifts and zoom of 0.3, horizontal flips).
+    There is no shear layer, so shear_range has no counterpart.
+    """
+    return tf.keras.Sequential([
+        tf.keras.layers.RandomFlip("horizontal", seed=seed),
+        tf.keras.layers.RandomRotation(40 / 360, fill_mode="nearest", seed=seed),
+        tf.keras.layers.RandomTranslation(0.3, 0.3, fill_mode="nearest", seed=seed),
+        tf.keras.layers.RandomZoom(0.3, fill_mode="nearest", seed=seed),
+    ], name="augmentation")
+
+
+def _cache_path(directory, paths, labels, img_size):
+    """
+    Cache file name tied to the image list, modification times and labels,
+    so adding, replacing or relabelling images starts a fresh cache instead
+    of reading a stale one
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(f"{path}:{os.path.getmtime(path)}".encode())
+    digest.update(np.asarray(labels).tobytes())
+    name = directory.strip("/\\").replace("/", "_").replace("\\", "_").replace(" ", "_")
+    return os.path.join(CACHE_DIR, f"{name}_{img_size[0]}x{img_size[1]}_{digest.hexdigest()[:12]}")
+
+
+def _decode(path, img_size):
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    image = tf.image.resize(image, img_size, antialias=True)
+    image.set_shape((*img_size, 3))
+    return image
+
+
+def image_batches(paths, batch_size=BATCH_SIZE, img_size=IMG_SIZE):
+    """
+    Prefetched batches of images scaled to [0, 1], in the order of paths,
+    for running a model over files rather than training on them
+    """
+    dataset = tf.data.Dataset.from_tensor_slices(list(paths))
+    dataset = dataset.map(lambda path: _decode(path, img_size) / 255.0, num_parallel_calls=AUTOTUNE)
+    return dataset.batch(batch_size).prefetch(AUTOTUNE)
+
+
+def make_dataset(directory, label_mode="categorical", batch_size=BATCH_SIZE, img_size=IMG_SIZE,
+                 shuffle=True, augment=False, cache=None, seed=None):
+    """
+    Build a batched, prefetched dataset of (images scaled to [0, 1], labels)
+    from directory/<class>/*.jpg
+
+    label_mode: 'categorical' (one-hot) or 'binary' (class index as float)
+    cache: None for no cache, True to keep decoded images in memory, or
+        'file' for a decoded-image cache under CACHE_DIR that survives
+        between runs
+    Returns (dataset, class_names)
+    """
+    paths, labels, class_names = list_image_files(directory)
+    if label_mode == "categorical":
+        labels = np.eye(len(class_names), dtype=np.float32)[labels]
+    elif label_mode == "binary":
+        labels = np.array(labels, dtype=np.float32).reshape(-1, 1)
+    else:
+        raise ValueError(f"Unknown label_mode '{label_mode}'")
+    dataset = dataset_from_files(paths, labels, batch_size, img_size, shuffle, augment, cache, seed,
+                                 cache_name=directory)
+    return dataset, class_names
+
+
+def dataset_from_files(paths, labels, batch_size=BATCH_SIZE, img_size=IMG_SIZE,
+                       shuffle=True, augment=False, cache=None, seed=None, cache_name="images"):
+    """
+    make_dataset for an explicit list of image paths and their label rows
+    (e.g. multi-hot side dish labels); cache_name names the cache file
+    """
+    dataset = tf.data.Dataset.from_tensor_slices((list(paths), labels))
+    if shuffle and not cache:
+        # Without a cache, shuffling the (cheap) file names is enough
+        dataset = dataset.shuffle(len(paths), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.map(
+        lambda path, label: (_decode(path, img_size), label),
+        num_parallel_calls=AUTOTUNE,
+        deterministic=not shuffle
+    )
+
+    if cache == "file":
+        cache_path = _cache_path(cache_name, paths, labels, img_size)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        dataset = dataset.cache(cache_path)
+    elif cache:
+        dataset = dataset.cache()
+    if shuffle and cache:
+        dataset = dataset.shuffle(len(paths), seed=seed, reshuffle_each_iteration=True)
+
+    dataset = dataset.batch(batch_size)
+    if augment:
+        augmentation = augmentation_layers(seed)
+        dataset = dataset.map(
+            lambda images, batch_labels: (augmentation(images, training=True), batch_labels),
+            num_parallel_calls=AUTOTUNE
+        )
+    dataset = dataset.map(
+        lambda images, batch_labels: (images / 255.0, batch_labels),
+        num_parallel_calls=AUTOTUNE
+    )
+    return dataset.prefetch(AUTOTUNE)
+
+
+class EpochTimer(tf.keras.callbacks.Callback):
+    """
+    Prints each epoch's wall time, so input pipeline changes show up directly
+    in the training log. The first epoch includes decoding into the cache.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.times = []
+        self._start = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.times.append(time.perf_counter() - self._start)
+        print(f"⏱️ Epoch {epoch + 1}: {self.times[-1]:.1f}s")
+
+    def on_train_end(self, logs=None):
+        if len(self.times) > 1:
+            later = self.times[1:]
+            print(f"⏱️ First epoch {self.times[0]:.1f}s, later epochs {sum(later) / len(later):.1f}s on average")
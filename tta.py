@@ -0,0 +1,65 @@
+import numpy as np
+from PIL import Image
+
+from image_pipeline import IMG_SIZE, decode_image
+
+# Test-time augmentation: K fixed views of an upload (flips, crops at two
+# scales) stacked into one (K, H, W, 3) batch, so the classifier sees them
+# all in a single forward pass, and its K outputs are averaged. Views come in
+# a fixed order, most useful first, so any K picks the same ones.
+
+# (crop box as fractions of the image: left, top, right, bottom; mirrored)
+VIEWS = [
+    ((0.0, 0.0, 1.0, 1.0), False),            # the plain resize the server uses
+    ((0.0, 0.0, 1.0, 1.0), True),
+    ((0.0625, 0.0625, 0.9375, 0.9375), False),  # centre crop, 87.5%
+    ((0.0625, 0.0625, 0.9375, 0.9375), True),
+    ((0.125, 0.125, 0.875, 0.875), False),      # centre crop, 75%
+    ((0.125, 0.125, 0.875, 0.875), True),
+    ((0.0, 0.0, 0.875, 0.875), False),          # top-left crop, 87.5%
+    ((0.125, 0.125, 1.0, 1.0), False),          # bottom-right crop, 87.5%
+]
+MAX_VIEWS = len(VIEWS)
+
+# Smallest crop side, as a fraction of the image; decoding keeps at least
+# size / MIN_CROP pixels so crops aren't upscaled
+MIN_CROP = 0.75
+
+
+def augmented_views(img, k, size=IMG_SIZE):
+    """
+    The first k VIEWS of a PIL image as a float32 (k, height, width, 3)
+    batch scaled to [0, 1]. Each crop is resized once; its mirrored view is
+    a flip of the same pixels.
+    """
+    if not 1 <= k <= MAX_VIEWS:
+        raise ValueError(f"TTA views must be between 1 and {MAX_VIEWS}, got {k}")
+    width, height = img.size
+    batch = np.empty((k, size[1], size[0], 3), dtype=np.float32)
+    resized = {}
+    for i, (box, mirrored) in enumerate(VIEWS[:k]):
+        if box not in resized:
+            pixel_box = (box[0] * width, box[1] * height, box[2] * width, box[3] * height)
+            resized[box] = np.asarray(img.resize(size, Image.BICUBIC, box=pixel_box), dtype=np.float32)
+        batch[i] = resized[box][:, ::-1] if mirrored else resized[box]
+    batch *= 1.0 / 255.0
+    return batch
+
+
+def preprocess_views(img_bytes, k, size=IMG_SIZE):
+    """
+    Decode an upload once and return its k-view batch (see augmented_views)
+    """
+    draft_size = (int(size[0] / MIN_CROP), int(size[1] / MIN_CROP))
+    img, img_format = decode_image(img_bytes, draft_size)
+    return augmented_views(img, k, size), img_format
+
+
+def average(outputs):
+    """
+    Average a model's outputs over the views (the batch axis), keeping a
+    batch of one; multi-output models give a list, averaged per output
+    """
+    if isinstance(outputs, (list, tuple)):
+        return [np.asarray(output).mean(axis=0, keepdims=True) for output in outputs]
+    return np.asarray(outputs).mean(axis=0, keepdims=True)